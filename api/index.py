@@ -1,44 +1,35 @@
 import sys
 import os
 
-# Add the backend directory to Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+# Resolve project paths once at import time
+_HERE = os.path.dirname(__file__)
+_BACKEND_DIR = os.path.join(_HERE, "..", "backend")
+_STATIC_DIR = os.path.join(_HERE, "..", "static")
+_TEMPLATES_DIR = os.path.join(_HERE, "..", "templates")
+
+# Put the backend directory first on the Python path so its modules resolve
+# ahead of anything installed in site-packages
+sys.path.insert(0, _BACKEND_DIR)
 
 import asyncio
 import time
-import json
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from datetime import datetime
 from typing import List, Dict
 import logging
 
 from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from pydantic import BaseModel
 
 # Import our modules
-try:
-    from sentiment_analyzer_vercel import AdvancedSentimentAnalyzer
-    from database import SentimentDatabase
-except ImportError:
-    # Fallback for Vercel
-    import importlib.util
-    
-    # Load sentiment_analyzer_vercel
-    spec = importlib.util.spec_from_file_location("sentiment_analyzer_vercel", 
-        os.path.join(os.path.dirname(__file__), "..", "backend", "sentiment_analyzer_vercel.py"))
-    sentiment_analyzer_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(sentiment_analyzer_module)
-    AdvancedSentimentAnalyzer = sentiment_analyzer_module.AdvancedSentimentAnalyzer
-    
-    # Load database
-    spec = importlib.util.spec_from_file_location("database", 
-        os.path.join(os.path.dirname(__file__), "..", "backend", "database.py"))
-    database_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(database_module)
-    SentimentDatabase = database_module.SentimentDatabase
+from sentiment_analyzer_vercel import AdvancedSentimentAnalyzer
+from database import SentimentDatabase
 
 # Configure logging
 logging.basicConfig(
@@ -51,9 +42,14 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Real-time Sentiment Analysis API",
     description="Advanced sentiment analysis system optimized for Vercel",
-    version="2.0.0"
+    version="2.0.0",
+    # orjson serializes the nested analytics payloads much faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
+# Compress larger JSON payloads such as analytics; tiny responses are left as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -65,14 +61,11 @@ app.add_middleware(
 
 # Mount static files and templates (adjust paths for Vercel)
 try:
-    static_path = os.path.join(os.path.dirname(__file__), "..", "static")
-    templates_path = os.path.join(os.path.dirname(__file__), "..", "templates")
-    
-    if os.path.exists(static_path):
-        app.mount("/static", StaticFiles(directory=static_path), name="static")
+    if os.path.exists(_STATIC_DIR):
+        app.mount("/static", StaticFiles(directory=_STATIC_DIR), name="static")
     
-    if os.path.exists(templates_path):
-        templates = Jinja2Templates(directory=templates_path)
+    if os.path.exists(_TEMPLATES_DIR):
+        templates = Jinja2Templates(directory=_TEMPLATES_DIR)
     else:
         templates = None
 except Exception as e:
@@ -90,23 +83,28 @@ except Exception as e:
     analyzer = None
     db = None
 
-# In-memory recent activity tracker (per serverless instance)
-recent_activity: dict = {}
+# In-memory recent activity tracker (per serverless instance).
+# Entries are kept oldest-first, so pruning only touches the stale head.
+recent_activity: "OrderedDict[str, float]" = OrderedDict()
+_now = time.monotonic
 
 def record_activity(ip: str):
     try:
         if not ip:
             return
-        recent_activity[ip] = datetime.utcnow()
+        recent_activity[ip] = _now()
+        recent_activity.move_to_end(ip)
     except Exception:
         pass
 
 def get_active_users(window_seconds: int = 300) -> int:
-    cutoff = datetime.utcnow() - timedelta(seconds=window_seconds)
-    # prune old entries
-    stale_keys = [k for k, ts in recent_activity.items() if ts < cutoff]
-    for k in stale_keys:
-        recent_activity.pop(k, None)
+    cutoff = _now() - window_seconds
+    # prune old entries from the front until we reach one inside the window
+    while recent_activity:
+        ts = next(iter(recent_activity.values()))
+        if ts >= cutoff:
+            break
+        recent_activity.popitem(last=False)
     return len(recent_activity)
 
 # Pydantic models
@@ -145,8 +143,8 @@ async def analyze_sentiment(request: SentimentRequest, req: Request, background_
     start_time = time.time()
     
     try:
-        # Perform sentiment analysis
-        result = await analyzer.analyze_comprehensive(request.text)
+        # Perform sentiment analysis off the event loop; it is CPU-bound
+        result = await run_in_threadpool(analyzer.analyze_text, request.text)
         processing_time = time.time() - start_time
         
         # Add processing time to result
@@ -185,8 +183,8 @@ async def analyze_batch_sentiment(request: BatchSentimentRequest, req: Request,
     start_time = time.time()
     
     try:
-        # Perform batch analysis
-        results = await analyzer.analyze_batch(request.texts)
+        # Perform batch analysis in a single threadpool hop
+        results = await run_in_threadpool(analyzer.analyze_texts, request.texts)
         processing_time = time.time() - start_time
         
         # Add processing time
@@ -206,9 +204,12 @@ async def analyze_batch_sentiment(request: BatchSentimentRequest, req: Request,
             user_agent = req.headers.get('user-agent', '')
             
             try:
-                for result in results:
-                    if 'error' not in result:
-                        background_tasks.add_task(db.save_review, result, client_ip, user_agent)
+                background_tasks.add_task(
+                    db.save_reviews_bulk,
+                    [result for result in results if 'error' not in result],
+                    client_ip,
+                    user_agent
+                )
             except Exception as db_error:
                 logger.warning(f"Batch database save failed: {db_error}")
         
@@ -218,49 +219,76 @@ async def analyze_batch_sentiment(request: BatchSentimentRequest, req: Request,
         logger.error(f"Error in batch sentiment analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Short-lived caches for the dashboard endpoints, which are polled by every open tab.
+# Each maps the `days` parameter to (stored_at, payload).
+CACHE_TTL_SECONDS = 5.0
+CACHE_MAX_ENTRIES = 64
+_analytics_cache: Dict[int, tuple] = {}
+_distribution_cache: Dict[int, tuple] = {}
+_emotion_cache: Dict[int, tuple] = {}
+
+def cache_get(cache: Dict, key):
+    entry = cache.get(key)
+    if entry and _now() - entry[0] < CACHE_TTL_SECONDS:
+        return entry[1]
+    return None
+
+def cache_put(cache: Dict, key, value):
+    if len(cache) >= CACHE_MAX_ENTRIES:
+        cache.clear()
+    cache[key] = (_now(), value)
+    return value
+
+def empty_summary(active_users: int) -> Dict:
+    """Analytics summary returned when the database has nothing to offer"""
+    return {
+        'total_reviews': 0,
+        'reviews_today': 0,
+        'average_confidence': 0,
+        'sentiment_distribution': {'counts': {}, 'percentages': {}, 'total': 0},
+        'emotion_analysis': {'emotion_averages': {}},
+        'active_users': active_users
+    }
+
+async def query_or_default(query, default, name: str):
+    """Await a database query, returning (result, ok) with a default instead of raising"""
+    try:
+        return await query, True
+    except Exception as e:
+        logger.error(f"Error getting {name}: {e}")
+        return default, False
+
 @app.get("/api/analytics")
 async def get_analytics(days: int = 7):
     """Get analytics summary"""
     active_users = get_active_users()
     if not db:
         return {
-            'summary': {
-                'total_reviews': 0,
-                'reviews_today': 0,
-                'average_confidence': 0,
-                'sentiment_distribution': {'counts': {}, 'percentages': {}, 'total': 0},
-                'emotion_analysis': {'emotion_averages': {}},
-                'active_users': active_users
-            },
+            'summary': empty_summary(active_users),
             'trends': {},
             'recent_reviews': []
         }
     
-    try:
-        summary = await db.get_analytics_summary()
-        trends = await db.get_sentiment_trends(days)
-        recent_reviews = await db.get_recent_reviews(limit=50)
-        
-        return {
+    payload = cache_get(_analytics_cache, days)
+    if payload is None:
+        # The three queries are independent, so run them concurrently.
+        # A failing query degrades to empty data instead of failing the endpoint.
+        (summary, ok_summary), (trends, ok_trends), (recent_reviews, ok_recent) = await asyncio.gather(
+            query_or_default(db.get_analytics_summary(), empty_summary(0), "analytics summary"),
+            query_or_default(db.get_sentiment_trends(days), {}, "sentiment trends"),
+            query_or_default(db.get_recent_reviews_summary(limit=50), [], "recent reviews")
+        )
+        payload = {
             'summary': summary,
             'trends': trends,
             'recent_reviews': recent_reviews
         }
-    except Exception as e:
-        logger.error(f"Error getting analytics: {e}")
-        # Return empty analytics instead of failing
-        return {
-            'summary': {
-                'total_reviews': 0,
-                'reviews_today': 0,
-                'average_confidence': 0,
-                'sentiment_distribution': {'counts': {}, 'percentages': {}, 'total': 0},
-                'emotion_analysis': {'emotion_averages': {}},
-                'active_users': active_users
-            },
-            'trends': {},
-            'recent_reviews': []
-        }
+        # Only cache complete results so a transient error isn't served for the whole TTL
+        if ok_summary and ok_trends and ok_recent:
+            cache_put(_analytics_cache, days, payload)
+    
+    # Active users is a live counter, so it is merged after the cache lookup
+    return {**payload, 'summary': {**payload['summary'], 'active_users': active_users}}
 
 @app.get("/api/recent-reviews")
 async def get_recent_reviews(limit: int = 100):
@@ -269,8 +297,10 @@ async def get_recent_reviews(limit: int = 100):
         return {'reviews': []}
     
     try:
-        reviews = await db.get_recent_reviews(limit)
-        return {'reviews': reviews}
+        # Emotions stay as the stored JSON text; returning the ORJSONResponse
+        # directly skips jsonable_encoder, which cannot handle orjson fragments
+        reviews = await db.get_recent_reviews(limit, raw_emotions=True)
+        return ORJSONResponse({'reviews': reviews})
     except Exception as e:
         logger.error(f"Error getting recent reviews: {e}")
         return {'reviews': []}
@@ -281,9 +311,13 @@ async def get_sentiment_distribution(days: int = 7):
     if not db:
         return {'counts': {}, 'percentages': {}, 'total': 0, 'period_days': days}
     
+    distribution = cache_get(_distribution_cache, days)
+    if distribution is not None:
+        return distribution
+    
     try:
         distribution = await db.get_sentiment_distribution(days)
-        return distribution
+        return cache_put(_distribution_cache, days, distribution)
     except Exception as e:
         logger.error(f"Error getting sentiment distribution: {e}")
         return {'counts': {}, 'percentages': {}, 'total': 0, 'period_days': days}
@@ -294,23 +328,41 @@ async def get_emotion_analysis(days: int = 7):
     if not db:
         return {'emotion_averages': {}, 'total_reviews': 0, 'period_days': days}
     
+    emotions = cache_get(_emotion_cache, days)
+    if emotions is not None:
+        return emotions
+    
     try:
         emotions = await db.get_emotion_analysis(days)
-        return emotions
+        return cache_put(_emotion_cache, days, emotions)
     except Exception as e:
         logger.error(f"Error getting emotion analysis: {e}")
         return {'emotion_averages': {}, 'total_reviews': 0, 'period_days': days}
 
+# Health probes are frequent, so the body is pre-rendered; component
+# availability is fixed at import time and only the timestamp varies
+_health_body_tmpl = (
+    b'{"status":"healthy","timestamp":"%s","analyzer_available":'
+    + (b'true' if analyzer is not None else b'false')
+    + b',"database_available":'
+    + (b'true' if db is not None else b'false')
+    + b',"environment":"vercel"}'
+)
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'analyzer_available': analyzer is not None,
-        'database_available': db is not None,
-        'environment': 'vercel'
-    }
+    return Response(
+        content=_health_body_tmpl % datetime.now().isoformat().encode(),
+        media_type="application/json"
+    )
+
+@app.get("/api/cache-stats")
+async def cache_stats():
+    """Debug view of the analyzer's result cache"""
+    if analyzer is None:
+        raise HTTPException(status_code=503, detail="Analyzer not available")
+    return analyzer.cache_info()
 
 # Startup event (modified for serverless)
 @app.on_event("startup")
@@ -323,7 +375,20 @@ async def startup_event():
             logger.info("Database initialized successfully")
         except Exception as e:
             logger.warning(f"Database initialization failed: {e}")
+    if analyzer:
+        # Run one throwaway analysis so the first real request doesn't pay
+        # for lazy initialization on a cold instance
+        try:
+            await analyzer.analyze_comprehensive("warmup")
+        except Exception as e:
+            logger.warning(f"Analyzer warmup failed: {e}")
     logger.info("API ready!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the shared database connection"""
+    if db:
+        await db.close()
+
 # Export the app for Vercel
 handler = app
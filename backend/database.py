@@ -1,19 +1,261 @@
 import sqlite3
-import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import asyncio
+from collections import defaultdict
 import aiosqlite
+import orjson
+from contextlib import asynccontextmanager
 from pathlib import Path
+import time
+
+# orjson for the JSON columns; it returns bytes, and the columns store TEXT
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _dumps(obj) -> str:
+    return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode()
+
+_loads = orjson.loads
+
+# Per-connection tuning; journal_mode is handled separately since WAL may be rejected
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Read-only connections opened under WAL; each runs on its own aiosqlite thread,
+# so this many reads can execute at the same time
+READ_POOL_SIZE = 2
+
+# Queued review writes are committed together: up to WRITE_BATCH_SIZE rows,
+# or whatever arrived within WRITE_BATCH_WAIT seconds of the first one
+WRITE_BATCH_SIZE = 100
+WRITE_BATCH_WAIT = 0.050
+
+# Shared by the single-row and bulk review inserts; see _review_row for the parameters
+INSERT_REVIEW_SQL = """
+    INSERT INTO reviews (
+        text, clean_text, sentiment, confidence,
+        vader_scores, transformer_scores, emotions, text_metrics,
+        timestamp, ip_address, user_agent
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Folds a batch of reviews into a day's stats; SET expressions see the
+# row's values from before the update
+UPSERT_DAILY_STATS_SQL = """
+    INSERT INTO sentiment_stats (date, sentiment, count, avg_confidence)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(date, sentiment) DO UPDATE SET
+        avg_confidence = (avg_confidence * count + excluded.avg_confidence * excluded.count)
+                         / (count + excluded.count),
+        count = count + excluded.count
+"""
+
+# True UPSERT: updates in place (no delete + re-insert) and skips unchanged rows.
+# Status, notes and the implemented/dismissed stamps of an existing row are kept.
+SAVE_SUGGESTION_SQL = """
+    INSERT INTO suggestions (
+        id, title, description, category, priority,
+        impact_score, effort_estimate, expected_outcome,
+        action_items, generated_at, analysis_period
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        title = excluded.title,
+        description = excluded.description,
+        category = excluded.category,
+        priority = excluded.priority,
+        impact_score = excluded.impact_score,
+        effort_estimate = excluded.effort_estimate,
+        expected_outcome = excluded.expected_outcome,
+        action_items = excluded.action_items,
+        generated_at = excluded.generated_at,
+        analysis_period = excluded.analysis_period
+    WHERE title IS NOT excluded.title
+     OR description IS NOT excluded.description
+     OR category IS NOT excluded.category
+     OR priority IS NOT excluded.priority
+     OR impact_score IS NOT excluded.impact_score
+     OR effort_estimate IS NOT excluded.effort_estimate
+     OR expected_outcome IS NOT excluded.expected_outcome
+     OR action_items IS NOT excluded.action_items
+     OR generated_at IS NOT excluded.generated_at
+     OR analysis_period IS NOT excluded.analysis_period
+"""
+
+# One statement for every status; the CASEs only stamp the matching timestamp
+UPDATE_SUGGESTION_STATUS_SQL = """
+    UPDATE suggestions SET
+        status = :status,
+        implemented_at = CASE WHEN :status = 'implemented' THEN :now ELSE implemented_at END,
+        dismissed_at = CASE WHEN :status = 'dismissed' THEN :now ELSE dismissed_at END,
+        notes = :notes
+    WHERE id = :id
+"""
+
+INSERT_SUGGESTION_FEEDBACK_SQL = """
+    INSERT INTO suggestion_feedback (suggestion_id, action, feedback, ip_address)
+    VALUES (?, ?, ?, ?)
+"""
+
+# Single-row running totals behind get_analytics_summary. The seed recomputes
+# them from reviews; the update folds in each committed batch of inserts.
+SEED_META_STATS_SQL = """
+    INSERT OR REPLACE INTO meta_stats (
+        id, total_reviews, sum_confidence, reviews_today_date, reviews_today_count
+    )
+    SELECT 1, COUNT(*), COALESCE(SUM(confidence), 0), :today,
+           COALESCE(SUM(CASE WHEN timestamp >= :today AND timestamp < :tomorrow THEN 1 ELSE 0 END), 0)
+    FROM reviews
+"""
+
+UPDATE_META_STATS_SQL = """
+    UPDATE meta_stats SET
+        total_reviews = total_reviews + :count,
+        sum_confidence = sum_confidence + :confidence_sum,
+        reviews_today_count = CASE
+            WHEN reviews_today_date = :today THEN reviews_today_count + :today_count
+            ELSE :today_count
+        END,
+        reviews_today_date = :today
+    WHERE id = 1
+"""
+
+# Suggestion fields backed by NOT NULL columns
+SUGGESTION_REQUIRED_FIELDS = (
+    'id', 'title', 'description', 'category', 'priority',
+    'impact_score', 'effort_estimate', 'generated_at', 'analysis_period'
+)
+
+def _today() -> str:
+    """Local date as an ISO string, matching the analyzer's local timestamps"""
+    return time.strftime('%Y-%m-%d')
+
+def _days_ago(days: int) -> str:
+    """SQLite date modifier for N days back, used with 'now', 'localtime'"""
+    return f"-{int(days)} days"
 
 class SentimentDatabase:
     def __init__(self, db_path: str = "data/sentiment_data.db"):
         self.db_path = db_path
         Path(db_path).parent.mkdir(exist_ok=True)
+        self.journal_mode = None
+        
+        # One long-lived connection per process; writers are serialized by the lock
+        self._conn: Optional[aiosqlite.Connection] = None
+        # Read-only connections under WAL so reads never queue behind writes
+        self._readers: List[aiosqlite.Connection] = []
+        self._next_reader = 0
+        self._reader_failed = False
+        self._connect_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        # Bumped after every committed write so callers can invalidate cached reads
+        self.write_version = 0
+        # Background review writer, started on first enqueue_review
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+    
+    async def _apply_pragmas(self, db: aiosqlite.Connection):
+        """Configure journaling and performance pragmas on a new connection"""
+        if self.journal_mode is None:
+            # WAL persists in the database file, so it only needs to be set once
+            try:
+                cursor = await db.execute("PRAGMA journal_mode=WAL")
+                self.journal_mode = (await cursor.fetchone())[0].lower()
+            except sqlite3.Error:
+                self.journal_mode = None
+            if self.journal_mode != 'wal':
+                # Some serverless filesystems cannot host the WAL/shm files
+                self.journal_mode = 'memory'
+        if self.journal_mode == 'memory':
+            await db.execute("PRAGMA journal_mode=MEMORY")
+        
+        for pragma in CONNECTION_PRAGMAS:
+            await db.execute(pragma)
+    
+    async def _connection(self) -> aiosqlite.Connection:
+        """Return the shared connection, opening it on first use"""
+        if self._conn is None:
+            async with self._connect_lock:
+                if self._conn is None:
+                    conn = await aiosqlite.connect(self.db_path)
+                    conn.row_factory = aiosqlite.Row
+                    await self._apply_pragmas(conn)
+                    self._conn = conn
+        return self._conn
+    
+    async def _read_connection(self) -> aiosqlite.Connection:
+        """Return a pooled read-only connection, or the shared one when unavailable"""
+        conn = await self._connection()
+        if self.journal_mode != 'wal':
+            return conn
+        if not self._readers and not self._reader_failed:
+            async with self._connect_lock:
+                uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+                while len(self._readers) < READ_POOL_SIZE and not self._reader_failed:
+                    try:
+                        reader = await aiosqlite.connect(uri, uri=True)
+                        reader.row_factory = aiosqlite.Row
+                        for pragma in CONNECTION_PRAGMAS:
+                            await reader.execute(pragma)
+                    except sqlite3.Error:
+                        self._reader_failed = True
+                        break
+                    self._readers.append(reader)
+        if not self._readers:
+            return conn
+        # Round-robin so concurrent reads land on different connections
+        self._next_reader = (self._next_reader + 1) % len(self._readers)
+        return self._readers[self._next_reader]
+    
+    @asynccontextmanager
+    async def _read(self):
+        """Yield a connection for read-only queries"""
+        conn = await self._read_connection()
+        if conn is self._conn:
+            # The shared connection sees its own uncommitted rows, so wait for
+            # any open write transaction rather than reading dirty data
+            async with self._write_lock:
+                yield conn
+        else:
+            yield conn
+    
+    @asynccontextmanager
+    async def _transaction(self):
+        """Yield the shared connection inside a serialized write transaction"""
+        async with self._write_lock:
+            db = await self._connection()
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                await db.rollback()
+                raise
+            await db.commit()
+            self.write_version += 1
+    
+    async def close(self):
+        """Flush queued reviews, then close the shared and read-only connections"""
+        if self._writer_task is not None:
+            await self._write_queue.join()
+            self._writer_task.cancel()
+            self._writer_task = None
+            self._write_queue = None
+        readers, self._readers = self._readers, []
+        for reader in readers:
+            await reader.close()
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            await conn.close()
     
     async def initialize_database(self):
         """Initialize the database with required tables"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._write_lock:
+            db = await self._connection()
+            
             # Create reviews table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS reviews (
@@ -89,107 +331,221 @@ class SentimentDatabase:
                 )
             """)
             
+            # Running totals for the analytics summary, maintained by the review writers
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS meta_stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total_reviews INTEGER NOT NULL,
+                    sum_confidence REAL NOT NULL,
+                    reviews_today_date DATE,
+                    reviews_today_count INTEGER NOT NULL
+                )
+            """)
+            
+            # Timestamp index for the range-filtered review queries; confidence is
+            # included so the today count and AVG(confidence) are covered
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_reviews_ts_conf ON reviews(timestamp, confidence)"
+            )
+            # No query filters on (timestamp, sentiment), so drop the index from older databases
+            await db.execute("DROP INDEX IF EXISTS idx_reviews_ts_sent")
+            
+            # Covering index for the date-ranged distribution and trends reads
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_stats_date_sent "
+                "ON sentiment_stats(date, sentiment, count, avg_confidence)"
+            )
+            
+            # Suggestion cleanup/recency filters and status-filtered listings
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_suggestions_gen ON suggestions(generated_at, status)"
+            )
+            # Matches get_suggestions' ORDER BY under status/category filters, so the
+            # planner walks it in order and stops at LIMIT; it supersedes the old
+            # (status, category, priority, impact_score) index
+            await db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_suggestions_order "
+                "ON suggestions(status, category, priority DESC, impact_score DESC, generated_at DESC)"
+            )
+            await db.execute("DROP INDEX IF EXISTS idx_suggestions_status_cat_prio")
+            
+            # Rebuild the running totals from reviews so they start out exact
+            today = datetime.now().date()
+            await db.execute(SEED_META_STATS_SQL, {
+                'today': today.isoformat(),
+                'tomorrow': (today + timedelta(days=1)).isoformat()
+            })
+            
+            await db.commit()
+            
+            # Refresh planner statistics; analysis_limit keeps this cheap on large tables
+            await db.execute("PRAGMA analysis_limit=400")
+            await db.execute("ANALYZE")
             await db.commit()
     
+    @staticmethod
+    def _review_row(result: Dict, ip_address: str = None, user_agent: str = None) -> tuple:
+        """Build the INSERT_REVIEW_SQL parameters for one analysis result"""
+        return (
+            result['text'],
+            result['clean_text'],
+            result['sentiment'],
+            result['confidence'],
+            _dumps(result.get('vader_analysis', {})),
+            _dumps(result.get('transformer_analysis', {})),
+            _dumps(result['emotions']),
+            _dumps(result['text_metrics']),
+            result['timestamp'],
+            ip_address,
+            user_agent
+        )
+    
     async def save_review(self, analysis_result: Dict, ip_address: str = None, user_agent: str = None):
         """Save a sentiment analysis result to the database"""
         if 'error' in analysis_result:
             return None
-            
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("""
-                INSERT INTO reviews (
-                    text, clean_text, sentiment, confidence,
-                    vader_scores, transformer_scores, emotions, text_metrics,
-                    timestamp, ip_address, user_agent
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                analysis_result['text'],
-                analysis_result['clean_text'],
-                analysis_result['sentiment'],
-                analysis_result['confidence'],
-                json.dumps(analysis_result.get('vader_analysis', {})),
-                json.dumps(analysis_result.get('transformer_analysis', {})),
-                json.dumps(analysis_result['emotions']),
-                json.dumps(analysis_result['text_metrics']),
-                analysis_result['timestamp'],
-                ip_address,
-                user_agent
-            ))
-            
+        
+        row = self._review_row(analysis_result, ip_address, user_agent)
+        today = _today()
+        
+        async with self._transaction() as db:
+            cursor = await db.execute(INSERT_REVIEW_SQL, row)
             review_id = cursor.lastrowid
-            await db.commit()
             
-            # Update daily stats
-            await self.update_daily_stats(analysis_result['sentiment'], analysis_result['confidence'])
+            # Update daily stats and running totals in the same transaction
+            await self._update_daily_stats(
+                db, today, analysis_result['sentiment'], 1, analysis_result['confidence']
+            )
+            await self._update_meta_stats(db, today, [row])
             
             return review_id
     
-    async def update_daily_stats(self, sentiment: str, confidence: float):
-        """Update daily sentiment statistics"""
-        today = datetime.now().date()
+    async def save_reviews_bulk(self, analysis_results: List[Dict], ip_address: str = None, user_agent: str = None) -> int:
+        """Save many sentiment analysis results in a single transaction"""
+        rows = [
+            self._review_row(result, ip_address, user_agent)
+            for result in analysis_results
+            if 'error' not in result
+        ]
+        if not rows:
+            return 0
         
-        async with aiosqlite.connect(self.db_path) as db:
-            # Check if stat exists for today and sentiment
-            cursor = await db.execute(
-                "SELECT count, avg_confidence FROM sentiment_stats WHERE date = ? AND sentiment = ?",
-                (today, sentiment)
+        await self._save_review_rows(rows)
+        return len(rows)
+    
+    def enqueue_review(self, analysis_result: Dict, ip_address: str = None, user_agent: str = None):
+        """Queue a result for the background writer instead of awaiting its commit"""
+        if 'error' in analysis_result:
+            return
+        
+        if self._writer_task is None:
+            self._write_queue = asyncio.Queue()
+            self._writer_task = asyncio.get_running_loop().create_task(
+                self._review_writer(self._write_queue)
             )
-            result = await cursor.fetchone()
-            
-            if result:
-                # Update existing stat
-                new_count = result[0] + 1
-                new_avg_confidence = (result[1] * result[0] + confidence) / new_count
-                
-                await db.execute("""
-                    UPDATE sentiment_stats 
-                    SET count = ?, avg_confidence = ? 
-                    WHERE date = ? AND sentiment = ?
-                """, (new_count, new_avg_confidence, today, sentiment))
-            else:
-                # Create new stat entry
-                await db.execute("""
-                    INSERT INTO sentiment_stats (date, sentiment, count, avg_confidence)
-                    VALUES (?, ?, 1, ?)
-                """, (today, sentiment, confidence))
+        # Build the row now so later changes to the result dict aren't persisted
+        self._write_queue.put_nowait(self._review_row(analysis_result, ip_address, user_agent))
+    
+    async def _review_writer(self, queue: asyncio.Queue):
+        """Commit queued review rows in batches, one transaction per batch"""
+        loop = asyncio.get_running_loop()
+        while True:
+            rows = [await queue.get()]
+            deadline = loop.time() + WRITE_BATCH_WAIT
+            while len(rows) < WRITE_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    rows.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._save_review_rows(rows)
+            except Exception as e:
+                print(f"Error saving {len(rows)} queued reviews: {e}")
+            finally:
+                for _ in rows:
+                    queue.task_done()
+    
+    async def _save_review_rows(self, rows: List[tuple]):
+        """Insert prepared review rows and fold them into the stats tables"""
+        # Aggregate the daily stats per sentiment so each bucket is touched once
+        stats = {}
+        for row in rows:
+            count, confidence_sum = stats.get(row[2], (0, 0.0))
+            stats[row[2]] = (count + 1, confidence_sum + row[3])
+        today = _today()
+        
+        async with self._transaction() as db:
+            await db.executemany(INSERT_REVIEW_SQL, rows)
             
-            await db.commit()
+            for sentiment, (count, confidence_sum) in stats.items():
+                await self._update_daily_stats(db, today, sentiment, count, confidence_sum)
+            await self._update_meta_stats(db, today, rows)
     
-    async def get_recent_reviews(self, limit: int = 100) -> List[Dict]:
-        """Get recent sentiment analysis results"""
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("""
+    async def _update_daily_stats(self, db: aiosqlite.Connection, today: str, sentiment: str,
+                                  count: int, confidence_sum: float):
+        """Fold `count` reviews into a day's stats; runs inside the caller's transaction"""
+        await db.execute(UPSERT_DAILY_STATS_SQL, (today, sentiment, count, confidence_sum / count))
+    
+    async def _update_meta_stats(self, db: aiosqlite.Connection, today: str, rows: List[tuple]):
+        """Fold inserted review rows into the running totals; runs inside the caller's transaction"""
+        await db.execute(UPDATE_META_STATS_SQL, {
+            'count': len(rows),
+            'confidence_sum': sum(row[3] for row in rows),
+            'today': today,
+            # Only rows stamped today count towards reviews_today, as in the old range query
+            'today_count': sum(1 for row in rows if str(row[8])[:10] == today)
+        })
+    
+    async def get_recent_reviews(self, limit: int = 100, raw_emotions: bool = False) -> List[Dict]:
+        """Get recent sentiment analysis results.
+        
+        With raw_emotions the stored emotions JSON is passed through as an
+        orjson.Fragment instead of being decoded; only use it when the result
+        goes straight to orjson (e.g. an ORJSONResponse).
+        """
+        reviews = []
+        async with self._read() as db:
+            # Stream rows in aiosqlite's fetch chunks and decode them in one pass
+            async with db.execute("""
                 SELECT text, sentiment, confidence, emotions, timestamp
                 FROM reviews 
                 ORDER BY timestamp DESC 
                 LIMIT ?
-            """, (limit,))
-            
-            results = await cursor.fetchall()
-            
-            return [
-                {
-                    'text': row[0],
-                    'sentiment': row[1],
-                    'confidence': row[2],
-                    'emotions': json.loads(row[3]) if row[3] else {},
-                    'timestamp': row[4]
-                }
-                for row in results
-            ]
+            """, (limit,)) as cursor:
+                async for row in cursor:
+                    review = dict(row)
+                    if raw_emotions:
+                        review['emotions'] = orjson.Fragment(review['emotions'] or '{}')
+                    else:
+                        review['emotions'] = _loads(review['emotions']) if review['emotions'] else {}
+                    reviews.append(review)
+        
+        return reviews
+    
+    async def get_recent_reviews_summary(self, limit: int = 50) -> List[Dict]:
+        """Get a compact view of recent reviews for dashboard lists"""
+        async with self._read() as db:
+            async with db.execute("""
+                SELECT sentiment, confidence, substr(text, 1, 120) AS text, timestamp
+                FROM reviews 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+            """, (limit,)) as cursor:
+                return [dict(row) async for row in cursor]
     
     async def get_sentiment_distribution(self, days: int = 7) -> Dict:
         """Get sentiment distribution over the last N days"""
-        start_date = (datetime.now() - timedelta(days=days)).date()
-        
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._read() as db:
             cursor = await db.execute("""
                 SELECT sentiment, SUM(count) as total_count
                 FROM sentiment_stats 
-                WHERE date >= ?
+                WHERE date >= date('now', 'localtime', ?)
                 GROUP BY sentiment
-            """, (start_date,))
+            """, (_days_ago(days),))
             
             results = await cursor.fetchall()
             
@@ -210,59 +566,78 @@ class SentimentDatabase:
     
     async def get_sentiment_trends(self, days: int = 30) -> Dict:
         """Get sentiment trends over time"""
-        start_date = (datetime.now() - timedelta(days=days)).date()
-        
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute("""
+        async with self._read() as db:
+            trends = defaultdict(dict)
+            async with db.execute("""
                 SELECT date, sentiment, count, avg_confidence
                 FROM sentiment_stats 
-                WHERE date >= ?
+                WHERE date >= date('now', 'localtime', ?)
                 ORDER BY date, sentiment
-            """, (start_date,))
-            
-            results = await cursor.fetchall()
-            
-            trends = {}
-            for row in results:
-                date_str = row[0]
-                if date_str not in trends:
-                    trends[date_str] = {}
-                
-                trends[date_str][row[1]] = {
-                    'count': row[2],
-                    'avg_confidence': row[3]
-                }
-            
-            return trends
+            """, (_days_ago(days),)) as cursor:
+                async for date_str, sentiment, count, avg_confidence in cursor:
+                    trends[date_str][sentiment] = {
+                        'count': count,
+                        'avg_confidence': avg_confidence
+                    }
+            
+            return dict(trends)
+    
+    async def get_sentiment_trend_columns(self, days: int = 30) -> Dict[str, List]:
+        """Get per-day sentiment counts as parallel, date-ordered columns"""
+        columns = {'dates': [], 'positive': [], 'neutral': [], 'negative': [], 'total': []}
+        async with self._read() as db:
+            # One row per day with the pivot done in SQLite; 'total' counts
+            # every sentiment label, not just the three pivoted ones
+            async with db.execute("""
+                SELECT date,
+                       SUM(CASE WHEN sentiment = 'positive' THEN count ELSE 0 END),
+                       SUM(CASE WHEN sentiment = 'neutral' THEN count ELSE 0 END),
+                       SUM(CASE WHEN sentiment = 'negative' THEN count ELSE 0 END),
+                       SUM(count)
+                FROM sentiment_stats 
+                WHERE date >= date('now', 'localtime', ?)
+                GROUP BY date
+                ORDER BY date
+            """, (_days_ago(days),)) as cursor:
+                async for date_str, pos, neu, neg, total in cursor:
+                    columns['dates'].append(date_str)
+                    columns['positive'].append(pos)
+                    columns['neutral'].append(neu)
+                    columns['negative'].append(neg)
+                    columns['total'].append(total)
+        
+        return columns
     
     async def get_emotion_analysis(self, days: int = 7) -> Dict:
         """Get emotion analysis for the last N days"""
-        start_date = (datetime.now() - timedelta(days=days)).date()
+        since = _days_ago(days)
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._read() as db:
+            # ISO timestamps sort lexically, so a bare date bound matches
+            # DATE(timestamp) >= ... while still seeking on the timestamp index.
+            # Aggregation runs inside SQLite; only one row per emotion comes back.
             cursor = await db.execute("""
-                SELECT emotions FROM reviews 
-                WHERE DATE(timestamp) >= ?
-            """, (start_date,))
-            
-            results = await cursor.fetchall()
-            
-            emotion_totals = {}
-            count = 0
-            
-            for row in results:
-                if row[0]:
-                    emotions = json.loads(row[0])
-                    count += 1
-                    for emotion, score in emotions.items():
-                        if emotion not in emotion_totals:
-                            emotion_totals[emotion] = 0
-                        emotion_totals[emotion] += score
+                SELECT COUNT(*) FROM reviews
+                WHERE timestamp >= date('now', 'localtime', ?)
+                  AND emotions IS NOT NULL AND emotions != ''
+            """, (since,))
+            count = (await cursor.fetchone())[0]
             
+            emotion_averages = {}
             if count > 0:
-                emotion_averages = {k: round(v / count, 3) for k, v in emotion_totals.items()}
-            else:
-                emotion_averages = {}
+                # MIN(je.id) keeps the keys in the order they appear in the stored JSON
+                cursor = await db.execute("""
+                    SELECT je.key, SUM(je.value)
+                    FROM reviews, json_each(reviews.emotions) AS je
+                    WHERE reviews.timestamp >= date('now', 'localtime', ?)
+                      AND reviews.emotions IS NOT NULL AND reviews.emotions != ''
+                    GROUP BY je.key
+                    ORDER BY MIN(je.id)
+                """, (since,))
+                emotion_averages = {
+                    emotion: round(total / count, 3)
+                    for emotion, total in await cursor.fetchall()
+                }
             
             return {
                 'emotion_averages': emotion_averages,
@@ -272,27 +647,28 @@ class SentimentDatabase:
     
     async def get_analytics_summary(self) -> Dict:
         """Get comprehensive analytics summary"""
-        # Get basic stats
-        async with aiosqlite.connect(self.db_path) as db:
-            # Total reviews
-            cursor = await db.execute("SELECT COUNT(*) FROM reviews")
-            total_reviews = (await cursor.fetchone())[0]
-            
-            # Reviews today
-            today = datetime.now().date()
-            cursor = await db.execute(
-                "SELECT COUNT(*) FROM reviews WHERE DATE(timestamp) = ?", 
-                (today,)
-            )
-            reviews_today = (await cursor.fetchone())[0]
-            
-            # Average confidence
-            cursor = await db.execute("SELECT AVG(confidence) FROM reviews")
-            avg_confidence = (await cursor.fetchone())[0] or 0
+        # Basic stats come from the running totals, so this is a single-row read
+        async with self._read() as db:
+            cursor = await db.execute("""
+                SELECT total_reviews, sum_confidence, reviews_today_date, reviews_today_count
+                FROM meta_stats
+                WHERE id = 1
+            """)
+            row = await cursor.fetchone()
+        
+        if row:
+            total_reviews = row['total_reviews']
+            avg_confidence = row['sum_confidence'] / total_reviews if total_reviews else 0
+            # The stored count belongs to the last day a review was written
+            reviews_today = row['reviews_today_count'] if row['reviews_today_date'] == _today() else 0
+        else:
+            total_reviews, reviews_today, avg_confidence = 0, 0, 0
         
-        # Get distribution and trends
-        distribution = await self.get_sentiment_distribution(7)
-        emotion_analysis = await self.get_emotion_analysis(7)
+        # Independent reads; under WAL they run on separate pooled connections
+        distribution, emotion_analysis = await asyncio.gather(
+            self.get_sentiment_distribution(7),
+            self.get_emotion_analysis(7)
+        )
         
         return {
             'total_reviews': total_reviews,
@@ -310,36 +686,39 @@ class SentimentDatabase:
         if not suggestions:
             return 0
             
-        saved_count = 0
-        async with aiosqlite.connect(self.db_path) as db:
-            for suggestion in suggestions:
-                try:
-                    await db.execute("""
-                        INSERT OR REPLACE INTO suggestions (
-                            id, title, description, category, priority,
-                            impact_score, effort_estimate, expected_outcome,
-                            action_items, generated_at, analysis_period
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        suggestion['id'],
-                        suggestion['title'],
-                        suggestion['description'],
-                        suggestion['category'],
-                        suggestion['priority'],
-                        suggestion['impact_score'],
-                        suggestion['effort_estimate'],
-                        suggestion.get('expected_outcome', ''),
-                        json.dumps(suggestion.get('action_items', [])),
-                        suggestion['generated_at'],
-                        suggestion['analysis_period']
-                    ))
-                    saved_count += 1
-                except Exception as e:
-                    print(f"Error saving suggestion {suggestion.get('id', 'unknown')}: {e}")
-                    
-            await db.commit()
-            
-        return saved_count
+        # Validate and marshal every row up front, then insert them in one call
+        rows = []
+        for suggestion in suggestions:
+            missing = [field for field in SUGGESTION_REQUIRED_FIELDS if suggestion.get(field) is None]
+            if missing:
+                print(f"Error saving suggestion {suggestion.get('id', 'unknown')}: missing {', '.join(missing)}")
+                continue
+            try:
+                action_items = _dumps(suggestion.get('action_items', []))
+            except (TypeError, ValueError) as e:
+                print(f"Error saving suggestion {suggestion['id']}: {e}")
+                continue
+            rows.append((
+                suggestion['id'],
+                suggestion['title'],
+                suggestion['description'],
+                suggestion['category'],
+                suggestion['priority'],
+                suggestion['impact_score'],
+                suggestion['effort_estimate'],
+                suggestion.get('expected_outcome', ''),
+                action_items,
+                suggestion['generated_at'],
+                suggestion['analysis_period']
+            ))
+        
+        if not rows:
+            return 0
+        
+        async with self._transaction() as db:
+            await db.executemany(SAVE_SUGGESTION_SQL, rows)
+        
+        return len(rows)
     
     async def get_suggestions(self, status: Optional[str] = None, category: Optional[str] = None, 
                              limit: int = 50) -> List[Dict]:
@@ -368,31 +747,16 @@ class SentimentDatabase:
         query += " ORDER BY priority DESC, impact_score DESC, generated_at DESC LIMIT ?"
         params.append(limit)
         
-        async with aiosqlite.connect(self.db_path) as db:
-            cursor = await db.execute(query, params)
-            results = await cursor.fetchall()
-            
+        async with self._read() as db:
             suggestions = []
-            for row in results:
-                suggestion = {
-                    'id': row[0],
-                    'title': row[1],
-                    'description': row[2],
-                    'category': row[3],
-                    'priority': row[4],
-                    'impact_score': row[5],
-                    'effort_estimate': row[6],
-                    'expected_outcome': row[7],
-                    'action_items': json.loads(row[8]) if row[8] else [],
-                    'status': row[9],
-                    'generated_at': row[10],
-                    'analysis_period': row[11],
-                    'implemented_at': row[12],
-                    'dismissed_at': row[13],
-                    'notes': row[14]
-                }
-                suggestions.append(suggestion)
-                
+            async with db.execute(query, params) as cursor:
+                async for row in cursor:
+                    suggestion = dict(row)
+                    suggestion['action_items'] = (
+                        _loads(suggestion['action_items']) if suggestion['action_items'] else []
+                    )
+                    suggestions.append(suggestion)
+            
             return suggestions
     
     async def update_suggestion_status(self, suggestion_id: str, status: str, 
@@ -402,44 +766,30 @@ class SentimentDatabase:
         if status not in valid_statuses:
             return False
             
-        async with aiosqlite.connect(self.db_path) as db:
-            # Update suggestion status
-            if status == 'implemented':
-                await db.execute("""
-                    UPDATE suggestions 
-                    SET status = ?, implemented_at = ?, notes = ?
-                    WHERE id = ?
-                """, (status, datetime.now().isoformat(), notes or '', suggestion_id))
-            elif status == 'dismissed':
-                await db.execute("""
-                    UPDATE suggestions 
-                    SET status = ?, dismissed_at = ?, notes = ?
-                    WHERE id = ?
-                """, (status, datetime.now().isoformat(), notes or '', suggestion_id))
-            else:
-                await db.execute("""
-                    UPDATE suggestions 
-                    SET status = ?, notes = ?
-                    WHERE id = ?
-                """, (status, notes or '', suggestion_id))
+        # Bind parameters before taking the write lock
+        notes = notes or ''
+        update_params = {
+            'status': status,
+            'now': datetime.now().isoformat(),
+            'notes': notes,
+            'id': suggestion_id
+        }
+        feedback_params = (suggestion_id, status, notes, ip_address)
+        
+        async with self._transaction() as db:
+            cursor = await db.execute(UPDATE_SUGGESTION_STATUS_SQL, update_params)
+            # The UPDATE's own rowcount; changes() would reflect the feedback INSERT
+            if cursor.rowcount == 0:
+                return False
             
             # Log the action in feedback table
-            await db.execute("""
-                INSERT INTO suggestion_feedback (suggestion_id, action, feedback, ip_address)
-                VALUES (?, ?, ?, ?)
-            """, (suggestion_id, status, notes or '', ip_address))
-            
-            await db.commit()
-            
-            # Check if update was successful
-            cursor = await db.execute("SELECT changes()")
-            changes = (await cursor.fetchone())[0]
+            await db.execute(INSERT_SUGGESTION_FEEDBACK_SQL, feedback_params)
             
-            return changes > 0
+            return True
     
     async def get_suggestion_stats(self) -> Dict:
         """Get statistics about suggestions"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._read() as db:
             # Total suggestions
             cursor = await db.execute("SELECT COUNT(*) FROM suggestions")
             total = (await cursor.fetchone())[0]
@@ -473,7 +823,7 @@ class SentimentDatabase:
             cursor = await db.execute("""
                 SELECT COUNT(*) 
                 FROM suggestions 
-                WHERE DATE(generated_at) >= DATE('now', '-7 days')
+                WHERE generated_at >= DATE('now', '-7 days')
             """)
             recent_suggestions = (await cursor.fetchone())[0]
             
@@ -490,15 +840,12 @@ class SentimentDatabase:
     
     async def delete_old_suggestions(self, days: int = 90) -> int:
         """Delete suggestions older than specified days (cleanup)"""
-        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-        
-        async with aiosqlite.connect(self.db_path) as db:
-            # Delete old suggestions
+        async with self._transaction() as db:
+            # Delete old suggestions; the cutoff is an ISO local timestamp like generated_at
             cursor = await db.execute("""
                 DELETE FROM suggestions 
-                WHERE generated_at < ? AND status IN ('dismissed', 'implemented')
-            """, (cutoff_date,))
-            
-            await db.commit()
+                WHERE generated_at < strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime', ?)
+                  AND status IN ('dismissed', 'implemented')
+            """, (_days_ago(days),))
             
             return cursor.rowcount
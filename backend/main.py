@@ -1,6 +1,5 @@
 import asyncio
 import time
-import json
 from datetime import datetime
 from typing import List, Dict
 import logging
@@ -9,8 +8,11 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Requ
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from pathlib import Path
+import orjson
 
 from sentiment_analyzer_vercel import AdvancedSentimentAnalyzer
 from database import SentimentDatabase
@@ -27,9 +29,14 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Real-time Sentiment Analysis API",
     description="Advanced sentiment analysis system with WebSocket support",
-    version="2.0.0"
+    version="2.0.0",
+    # orjson serializes the nested analytics payloads much faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
+# Compress larger JSON payloads such as analytics; tiny responses are left as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -52,6 +59,27 @@ analyzer = AdvancedSentimentAnalyzer()
 db = SentimentDatabase()
 suggestion_engine = SuggestionEngine(db)
 
+# Short-lived cache for the dashboard queries, which every open tab and new
+# WebSocket connection repeats. Maps a query key to (stored_at, write_version,
+# result); any committed write makes older entries stale.
+CACHE_TTL_SECONDS = 5.0
+CACHE_MAX_ENTRIES = 64
+_query_cache: Dict[tuple, tuple] = {}
+
+async def cached_query(key: tuple, query, *args):
+    """Return a recent result for `key`, or await query(*args) and cache it"""
+    entry = _query_cache.get(key)
+    if entry and entry[1] == db.write_version and time.monotonic() - entry[0] < CACHE_TTL_SECONDS:
+        return entry[2]
+    
+    # Read the version first so a write that lands mid-query isn't masked
+    version = db.write_version
+    result = await query(*args)
+    if len(_query_cache) >= CACHE_MAX_ENTRIES:
+        _query_cache.clear()
+    _query_cache[key] = (time.monotonic(), version, result)
+    return result
+
 # Pydantic models
 class SentimentRequest(BaseModel):
     text: str
@@ -65,6 +93,9 @@ class SuggestionStatusRequest(BaseModel):
     status: str
     notes: str = None
 
+# Number of WebSocket sends in flight at once during a broadcast
+BROADCAST_BATCH = 50
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
@@ -80,21 +111,34 @@ class ConnectionManager:
             self.active_connections.remove(websocket)
         logger.info(f"WebSocket disconnected. Total: {len(self.active_connections)}")
     
-    async def send_personal_message(self, message: str, websocket: WebSocket):
+    async def send_personal_message(self, message: Dict, websocket: WebSocket):
         try:
-            await websocket.send_text(message)
+            # Text frames, since the dashboard JSON.parses event.data
+            await websocket.send_text(orjson.dumps(message).decode())
         except Exception as e:
             logger.error(f"Error sending message: {e}")
             self.disconnect(websocket)
     
-    async def broadcast(self, message: str):
+    async def broadcast(self, message: Dict):
+        # Encode once for every recipient
+        message = orjson.dumps(message).decode()
         disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to connection: {e}")
-                disconnected.append(connection)
+        # Snapshot the list, since clients may connect or drop while sends are
+        # in flight; sends overlap within a batch so one slow peer doesn't
+        # serialize the rest
+        connections = list(self.active_connections)
+        for start in range(0, len(connections), BROADCAST_BATCH):
+            batch = connections[start:start + BROADCAST_BATCH]
+            results = await asyncio.gather(
+                *[connection.send_text(message) for connection in batch],
+                return_exceptions=True
+            )
+            for connection, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error broadcasting to connection: {result}")
+                    disconnected.append(connection)
+            # Let other requests run between batches
+            await asyncio.sleep(0)
         
         # Remove disconnected connections
         for conn in disconnected:
@@ -102,6 +146,22 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+def _preview(text: str, length: int = 100) -> str:
+    """First `length` characters of a review, with an ellipsis when cut"""
+    return text if len(text) <= length else text[:length] + '...'
+
+def new_analysis_message(result: Dict, text: str) -> Dict:
+    """WebSocket broadcast announcing a freshly analyzed review"""
+    return {
+        'type': 'new_analysis',
+        'data': {
+            'sentiment': result['sentiment'],
+            'confidence': result['confidence'],
+            'text_preview': _preview(text),
+            'timestamp': result['timestamp']
+        }
+    }
+
 # Routes
 @app.get("/")
 async def home(request: Request):
@@ -126,24 +186,10 @@ async def analyze_sentiment(request: SentimentRequest, req: Request, background_
             client_ip = req.client.host
             user_agent = req.headers.get('user-agent', '')
             
-            background_tasks.add_task(
-                db.save_review, 
-                result, 
-                client_ip, 
-                user_agent
-            )
+            db.enqueue_review(result, client_ip, user_agent)
             
             # Broadcast to WebSocket connections
-            broadcast_message = {
-                'type': 'new_analysis',
-                'data': {
-                    'sentiment': result['sentiment'],
-                    'confidence': result['confidence'],
-                    'text_preview': request.text[:100] + ('...' if len(request.text) > 100 else ''),
-                    'timestamp': result['timestamp']
-                }
-            }
-            background_tasks.add_task(manager.broadcast, json.dumps(broadcast_message))
+            background_tasks.add_task(manager.broadcast, new_analysis_message(result, request.text))
         
         return result
         
@@ -174,9 +220,8 @@ async def analyze_batch_sentiment(request: BatchSentimentRequest, req: Request,
             client_ip = req.client.host
             user_agent = req.headers.get('user-agent', '')
             
-            for result in results:
-                if 'error' not in result:
-                    background_tasks.add_task(db.save_review, result, client_ip, user_agent)
+            # One background transaction for the whole batch
+            background_tasks.add_task(db.save_reviews_bulk, results, client_ip, user_agent)
         
         return batch_result
         
@@ -188,9 +233,9 @@ async def analyze_batch_sentiment(request: BatchSentimentRequest, req: Request,
 async def get_analytics(days: int = 7):
     """Get analytics summary"""
     try:
-        summary = await db.get_analytics_summary()
-        trends = await db.get_sentiment_trends(days)
-        recent_reviews = await db.get_recent_reviews(limit=50)
+        summary = await cached_query(('summary',), db.get_analytics_summary)
+        trends = await cached_query(('trends', days), db.get_sentiment_trends, days)
+        recent_reviews = await cached_query(('recent_summary',), db.get_recent_reviews_summary, 50)
         
         return {
             'summary': summary,
@@ -205,7 +250,7 @@ async def get_analytics(days: int = 7):
 async def get_recent_reviews(limit: int = 100):
     """Get recent sentiment analysis results"""
     try:
-        reviews = await db.get_recent_reviews(limit)
+        reviews = await cached_query(('recent', limit), db.get_recent_reviews, limit)
         return {'reviews': reviews}
     except Exception as e:
         logger.error(f"Error getting recent reviews: {e}")
@@ -215,7 +260,7 @@ async def get_recent_reviews(limit: int = 100):
 async def get_sentiment_distribution(days: int = 7):
     """Get sentiment distribution"""
     try:
-        distribution = await db.get_sentiment_distribution(days)
+        distribution = await cached_query(('distribution', days), db.get_sentiment_distribution, days)
         return distribution
     except Exception as e:
         logger.error(f"Error getting sentiment distribution: {e}")
@@ -225,7 +270,7 @@ async def get_sentiment_distribution(days: int = 7):
 async def get_emotion_analysis(days: int = 7):
     """Get emotion analysis"""
     try:
-        emotions = await db.get_emotion_analysis(days)
+        emotions = await cached_query(('emotions', days), db.get_emotion_analysis, days)
         return emotions
     except Exception as e:
         logger.error(f"Error getting emotion analysis: {e}")
@@ -240,14 +285,14 @@ async def websocket_endpoint(websocket: WebSocket):
         # Send initial analytics data
         initial_data = {
             'type': 'initial_data',
-            'data': await db.get_analytics_summary()
+            'data': await cached_query(('summary',), db.get_analytics_summary)
         }
-        await manager.send_personal_message(json.dumps(initial_data), websocket)
+        await manager.send_personal_message(initial_data, websocket)
         
         while True:
             # Wait for messages from client
             data = await websocket.receive_text()
-            message = json.loads(data)
+            message = orjson.loads(data)
             
             if message['type'] == 'analyze_text':
                 # Real-time sentiment analysis
@@ -265,32 +310,23 @@ async def websocket_endpoint(websocket: WebSocket):
                         'type': 'analysis_result',
                         'data': result
                     }
-                    await manager.send_personal_message(json.dumps(response), websocket)
+                    await manager.send_personal_message(response, websocket)
                     
-                    # Save to database
+                    # Queue for the database writer
                     if 'error' not in result:
-                        await db.save_review(result)
+                        db.enqueue_review(result)
                         
                         # Broadcast to all connected clients
-                        broadcast_message = {
-                            'type': 'new_analysis',
-                            'data': {
-                                'sentiment': result['sentiment'],
-                                'confidence': result['confidence'],
-                                'text_preview': text[:100] + ('...' if len(text) > 100 else ''),
-                                'timestamp': result['timestamp']
-                            }
-                        }
-                        await manager.broadcast(json.dumps(broadcast_message))
+                        await manager.broadcast(new_analysis_message(result, text))
                         
             elif message['type'] == 'get_analytics':
                 # Send updated analytics
-                analytics = await db.get_analytics_summary()
+                analytics = await cached_query(('summary',), db.get_analytics_summary)
                 response = {
                     'type': 'analytics_update',
                     'data': analytics
                 }
-                await manager.send_personal_message(json.dumps(response), websocket)
+                await manager.send_personal_message(response, websocket)
                 
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -309,6 +345,7 @@ async def generate_suggestions(days: int = 30, background_tasks: BackgroundTasks
         
         # Generate suggestions
         suggestions = await suggestion_engine.generate_suggestions(analysis, days)
+        generated_at = datetime.now().isoformat()
         
         # Save suggestions to database in background
         if suggestions and background_tasks:
@@ -320,10 +357,10 @@ async def generate_suggestions(days: int = 30, background_tasks: BackgroundTasks
                 'data': {
                     'count': len(suggestions),
                     'high_priority': len([s for s in suggestions if s.get('priority') == 'high']),
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': generated_at
                 }
             }
-            background_tasks.add_task(manager.broadcast, json.dumps(broadcast_message))
+            background_tasks.add_task(manager.broadcast, broadcast_message)
         
         return {
             'suggestions': suggestions,
@@ -332,7 +369,7 @@ async def generate_suggestions(days: int = 30, background_tasks: BackgroundTasks
                 'sentiment_trend': analysis.get('sentiment_trend', {}),
                 'common_issues': analysis.get('common_issues', {})
             },
-            'generated_at': datetime.now().isoformat(),
+            'generated_at': generated_at,
             'analysis_period_days': days
         }
     except Exception as e:
@@ -379,6 +416,8 @@ async def update_suggestion_status(suggestion_id: str, request: SuggestionStatus
         else:
             raise HTTPException(status_code=404, detail="Suggestion not found")
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating suggestion status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -434,12 +473,23 @@ async def startup_event():
     await db.initialize_database()
     logger.info("API ready!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the shared database connection"""
+    await db.close()
+
 if __name__ == "__main__":
+    import os
     import uvicorn
+    # WebSocket clients and the review write queue live in-process, so extra
+    # workers (WEB_CONCURRENCY, as with the uvicorn CLI) only broadcast to
+    # their own connections
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop",
+        http="httptools",
         log_level="info"
     )
@@ -85,6 +85,11 @@ async def startup_event():
     await db.initialize_database()
     logger.info("API ready!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the shared database connection"""
+    await db.close()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+One-time export of the transformer sentiment model to INT8 ONNX
+The full analyzer picks the result up automatically from ONNX_MODEL_DIR
+Requires: pip install "optimum[onnxruntime]"
+"""
+
+import os
+
+from optimum.onnxruntime import ORTModelForSequenceClassification
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from transformers import AutoTokenizer
+
+from sentiment_analyzer import MODEL_NAME, ONNX_MODEL_DIR, ONNX_MODEL_FILE
+
+def export_quantized_model():
+    """Export the model to ONNX, then quantize its weights to INT8"""
+    print(f"📦 Exporting {MODEL_NAME} to ONNX...")
+    model = ORTModelForSequenceClassification.from_pretrained(MODEL_NAME, export=True)
+    model.save_pretrained(ONNX_MODEL_DIR)
+    AutoTokenizer.from_pretrained(MODEL_NAME).save_pretrained(ONNX_MODEL_DIR)
+    
+    print("⚙️ Applying dynamic INT8 quantization...")
+    quantize_dynamic(
+        os.path.join(ONNX_MODEL_DIR, "model.onnx"),
+        os.path.join(ONNX_MODEL_DIR, ONNX_MODEL_FILE),
+        weight_type=QuantType.QInt8
+    )
+    
+    print(f"✅ Quantized model written to {os.path.join(ONNX_MODEL_DIR, ONNX_MODEL_FILE)}")
+
+if __name__ == "__main__":
+    export_quantized_model()
@@ -1,9 +1,10 @@
 import asyncio
 import logging
-from typing import Dict, List, Tuple
-import numpy as np
+import os
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import re
+from operator import itemgetter
 
 # NLP Libraries
 import nltk
@@ -11,19 +12,99 @@ from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
 import torch
 
-# Download NLTK data
+# Optional ONNX Runtime backend for a pre-quantized INT8 export of the model
 try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    nltk.download('wordnet', quiet=True)
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+except ImportError:
+    ORTModelForSequenceClassification = None
+
+# Download NLTK data that isn't installed yet; deployments bake it in at
+# build time, so this normally finds everything without touching the network
+try:
+    for _package, _resource in (('punkt', 'tokenizers/punkt'),
+                                ('stopwords', 'corpora/stopwords'),
+                                ('wordnet', 'corpora/wordnet')):
+        try:
+            nltk.data.find(_resource)
+        except LookupError:
+            nltk.download(_package, quiet=True)
 except:
     pass
 
+# Text cleanup patterns, compiled once at import; URLs run to the next whitespace
+_URL_RE = re.compile(r'https?://\S+')
+_HTML_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+# Runs of '!' or '?' collapse to one character; a callable replacement is
+# much cheaper than expanding a '\1' template per match
+_REPEAT_PUNCT_RE = re.compile(r'([!?])\1+')
+_FIRST_GROUP = itemgetter(1)
+
+_ASCII_UPPER = b'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+def _count_upper(text: str) -> int:
+    """Count uppercase characters; ASCII text is counted with one C-level translate"""
+    if text.isascii():
+        return len(text) - len(text.encode('ascii').translate(None, _ASCII_UPPER))
+    return sum(1 for c in text if c.isupper())
+
+# Emotion lexicon: each emotion scores the fraction of its keywords found in the text
+EMOTION_KEYWORDS = {
+    'joy': ['happy', 'joy', 'excited', 'delighted', 'pleased', 'satisfied', 'amazing', 'wonderful', 'excellent', 'fantastic'],
+    'anger': ['angry', 'frustrated', 'annoyed', 'furious', 'irritated', 'outraged', 'terrible', 'awful', 'horrible', 'disgusting'],
+    'sadness': ['sad', 'disappointed', 'depressed', 'upset', 'heartbroken', 'miserable', 'poor', 'bad', 'worse', 'worst'],
+    'fear': ['afraid', 'scared', 'worried', 'anxious', 'nervous', 'concerned', 'uncertain', 'doubtful'],
+    'surprise': ['surprised', 'shocked', 'amazed', 'astonished', 'unexpected', 'wow', 'incredible'],
+    'disgust': ['disgusted', 'revolting', 'repulsive', 'gross', 'nasty', 'yuck']
+}
+
+# (emotion, keywords, keyword_count) lookup table, built once at import
+_EMOTION_LEXICON = tuple(
+    (emotion, tuple(keywords), len(keywords))
+    for emotion, keywords in EMOTION_KEYWORDS.items()
+    if keywords
+)
+
+# Transformer model and the location of its INT8 ONNX export (see quantize_model.py)
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment-latest"
+ONNX_MODEL_DIR = os.getenv(
+    'SENTIMENT_ONNX_DIR', os.path.join(os.path.dirname(__file__), 'models', 'roberta-int8')
+)
+ONNX_MODEL_FILE = "model_int8.onnx"
+
+# Map labels to consistent format
+_LABEL_MAPPING = {
+    'LABEL_0': 'negative',
+    'LABEL_1': 'neutral', 
+    'LABEL_2': 'positive',
+    'NEGATIVE': 'negative',
+    'NEUTRAL': 'neutral',
+    'POSITIVE': 'positive'
+}
+
+# Concurrent transformer calls are grouped into one forward pass: a batch
+# closes at TRANSFORMER_MAX_BATCH texts or TRANSFORMER_MAX_WAIT seconds
+TRANSFORMER_MAX_BATCH = 32
+TRANSFORMER_MAX_WAIT = 0.010
+
+# Model context limit; longer texts are truncated by the pipeline
+TRANSFORMER_MAX_TOKENS = 512
+
+# Approximate token lengths of the warm-up inferences run at load time
+WARMUP_LENGTHS = (16, 64, 128)
+
 class AdvancedSentimentAnalyzer:
     def __init__(self):
         self.vader_analyzer = SentimentIntensityAnalyzer()
-        self.setup_transformers_model()
         self.setup_logging()
+        self.setup_transformers_model()
+        # Truncation rate of batched transformer inputs
+        self._texts_scored = 0
+        self._texts_truncated = 0
+        # Micro-batching state, created on first use inside the running loop
+        self._batch_queue = None
+        self._batch_loop = None
+        self._batch_worker_task = None
         
     def setup_logging(self):
         logging.basicConfig(level=logging.INFO)
@@ -32,37 +113,93 @@ class AdvancedSentimentAnalyzer:
     def setup_transformers_model(self):
         """Initialize HuggingFace transformer model for more accurate analysis"""
         try:
+            # Split the cores between uvicorn workers instead of every worker
+            # starting one intra-op thread per core
+            workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+            torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                # Only settable before any inter-op work has started
+                pass
+            
             # Using a lightweight but accurate model
-            model_name = "cardiffnlp/twitter-roberta-base-sentiment-latest"
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+            self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+            onnx_path = os.path.join(ONNX_MODEL_DIR, ONNX_MODEL_FILE)
+            if ORTModelForSequenceClassification is not None and os.path.exists(onnx_path):
+                # INT8 weights run the attention/FFN matmuls much faster on CPU
+                self.model = ORTModelForSequenceClassification.from_pretrained(
+                    ONNX_MODEL_DIR,
+                    file_name=ONNX_MODEL_FILE,
+                    provider="CPUExecutionProvider"
+                )
+                device = -1
+                backend = "ONNX Runtime INT8"
+            else:
+                self.model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+                device = 0 if torch.cuda.is_available() else -1
+                backend = "PyTorch"
             self.transformer_pipeline = pipeline(
                 "sentiment-analysis", 
                 model=self.model, 
                 tokenizer=self.tokenizer,
-                device=0 if torch.cuda.is_available() else -1,
-                max_length=512,
+                device=device,
+                max_length=TRANSFORMER_MAX_TOKENS,
                 truncation=True
             )
-            self.logger.info("Transformer model loaded successfully")
+            # Compiling warms the model up as part of its first calls
+            if backend != "PyTorch" or not self._compile_model():
+                self._warm_up()
+            self.logger.info(f"Transformer model loaded successfully ({backend})")
         except Exception as e:
             self.logger.warning(f"Could not load transformer model: {e}")
             self.transformer_pipeline = None
     
+    def _warm_up(self):
+        """Run throwaway inferences at typical review lengths so the first
+        requests don't pay for kernel selection and buffer allocation"""
+        with torch.inference_mode():
+            for length in WARMUP_LENGTHS:
+                self.transformer_pipeline("ok " * length)
+    
+    def _compile_model(self) -> bool:
+        """JIT-compile the model's forward pass and pay the compile cost up front"""
+        version = tuple(int(part) for part in torch.__version__.split('+')[0].split('.')[:2])
+        if version < (2, 1):
+            return False
+        
+        self.model.eval()
+        eager_forward = self.model.forward
+        try:
+            # Compiling forward rather than the module keeps the pipeline's
+            # PreTrainedModel checks working; dynamic shapes avoid a recompile
+            # for every new sequence length
+            self.model.forward = torch.compile(
+                eager_forward,
+                mode="reduce-overhead" if torch.cuda.is_available() else "default",
+                dynamic=True
+            )
+            # Compilation happens on these calls rather than on the first request
+            self._warm_up()
+            return True
+        except Exception as e:
+            self.model.forward = eager_forward
+            self.logger.warning(f"torch.compile unavailable, using eager mode: {e}")
+            return False
+    
     def preprocess_text(self, text: str) -> str:
         """Clean and preprocess text for analysis"""
         # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+        text = _URL_RE.sub('', text)
         
         # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
+        text = _HTML_RE.sub('', text)
         
         # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WS_RE.sub(' ', text).strip()
         
         # Remove excessive punctuation
-        text = re.sub(r'[!]{2,}', '!', text)
-        text = re.sub(r'[?]{2,}', '?', text)
+        text = _REPEAT_PUNCT_RE.sub(_FIRST_GROUP, text)
         
         return text
     
@@ -92,48 +229,103 @@ class AdvancedSentimentAnalyzer:
             return None
             
         try:
-            result = self.transformer_pipeline(text)[0]
-            
-            # Map labels to consistent format
-            label_mapping = {
-                'LABEL_0': 'negative',
-                'LABEL_1': 'neutral', 
-                'LABEL_2': 'positive',
-                'NEGATIVE': 'negative',
-                'NEUTRAL': 'neutral',
-                'POSITIVE': 'positive'
-            }
+            with torch.inference_mode():
+                result = self.transformer_pipeline(text)[0]
+            return self._format_transformer_result(result)
+        except Exception as e:
+            self.logger.error(f"Transformer analysis failed: {e}")
+            return None
+    
+    def _format_transformer_result(self, result: Dict) -> Dict:
+        """Convert one raw pipeline prediction into the analyzer's format"""
+        sentiment = _LABEL_MAPPING.get(result['label'].upper(), result['label'].lower())
+        
+        return {
+            'sentiment': sentiment,
+            'confidence': result['score'],
+            'method': 'Transformer'
+        }
+    
+    def analyze_transformer_batch(self, texts: List[str]) -> List[Optional[Dict]]:
+        """Run the transformer once over a list of texts"""
+        try:
+            # Each pipeline batch is padded to its longest text, so sorting by
+            # token length keeps one long review from padding 31 short ones
+            lengths = [len(ids) for ids in self.tokenizer(texts)['input_ids']]
+            order = sorted(range(len(texts)), key=lengths.__getitem__)
+            self._record_truncation(lengths)
             
-            sentiment = label_mapping.get(result['label'].upper(), result['label'].lower())
+            with torch.inference_mode():
+                results = self.transformer_pipeline(
+                    [texts[index] for index in order], batch_size=TRANSFORMER_MAX_BATCH
+                )
             
-            return {
-                'sentiment': sentiment,
-                'confidence': result['score'],
-                'method': 'Transformer'
-            }
+            formatted = [None] * len(texts)
+            for index, result in zip(order, results):
+                formatted[index] = self._format_transformer_result(result)
+            return formatted
         except Exception as e:
-            self.logger.error(f"Transformer analysis failed: {e}")
+            self.logger.error(f"Batched transformer analysis failed: {e}")
+            return [None] * len(texts)
+    
+    def _record_truncation(self, lengths: List[int]):
+        """Track how many inputs exceed the model's token limit"""
+        truncated = sum(1 for length in lengths if length > TRANSFORMER_MAX_TOKENS)
+        self._texts_scored += len(lengths)
+        self._texts_truncated += truncated
+        if truncated:
+            self.logger.info(
+                f"Truncated {truncated}/{len(lengths)} texts to {TRANSFORMER_MAX_TOKENS} tokens "
+                f"(overall rate {self._texts_truncated / self._texts_scored:.1%})"
+            )
+    
+    async def _submit_to_transformer_batch(self, text: str) -> Optional[Dict]:
+        """Queue a text for the next micro-batch and wait for its result"""
+        if not self.transformer_pipeline:
             return None
+        
+        loop = asyncio.get_running_loop()
+        if self._batch_loop is not loop:
+            # asyncio queues are bound to a loop, so start one per loop
+            self._batch_loop = loop
+            self._batch_queue = asyncio.Queue()
+            self._batch_worker_task = loop.create_task(self._batch_worker(self._batch_queue))
+        
+        future = loop.create_future()
+        self._batch_queue.put_nowait((text, future))
+        return await future
+    
+    async def _batch_worker(self, queue: asyncio.Queue):
+        """Drain queued texts into micro-batches and resolve their futures"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + TRANSFORMER_MAX_WAIT
+            while len(batch) < TRANSFORMER_MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # The forward pass is CPU/GPU bound, so keep it off the event loop
+            results = await asyncio.to_thread(
+                self.analyze_transformer_batch, [text for text, _ in batch]
+            )
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
     
     def get_emotion_indicators(self, text: str) -> Dict[str, float]:
         """Extract emotion indicators from text"""
-        emotion_keywords = {
-            'joy': ['happy', 'joy', 'excited', 'delighted', 'pleased', 'satisfied', 'amazing', 'wonderful', 'excellent', 'fantastic'],
-            'anger': ['angry', 'frustrated', 'annoyed', 'furious', 'irritated', 'outraged', 'terrible', 'awful', 'horrible', 'disgusting'],
-            'sadness': ['sad', 'disappointed', 'depressed', 'upset', 'heartbroken', 'miserable', 'poor', 'bad', 'worse', 'worst'],
-            'fear': ['afraid', 'scared', 'worried', 'anxious', 'nervous', 'concerned', 'uncertain', 'doubtful'],
-            'surprise': ['surprised', 'shocked', 'amazed', 'astonished', 'unexpected', 'wow', 'incredible'],
-            'disgust': ['disgusted', 'revolting', 'repulsive', 'gross', 'nasty', 'yuck']
-        }
-        
         text_lower = text.lower()
-        emotions = {}
         
-        for emotion, keywords in emotion_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            emotions[emotion] = score / len(keywords) if keywords else 0
-            
-        return emotions
+        return {
+            emotion: sum(1 for keyword in keywords if keyword in text_lower) / keyword_count
+            for emotion, keywords, keyword_count in _EMOTION_LEXICON
+        }
     
     def calculate_text_metrics(self, text: str) -> Dict:
         """Calculate various text metrics"""
@@ -143,29 +335,32 @@ class AdvancedSentimentAnalyzer:
         return {
             'word_count': len(words),
             'sentence_count': len([s for s in sentences if s.strip()]),
-            'avg_word_length': np.mean([len(word) for word in words]) if words else 0,
+            'avg_word_length': sum(map(len, words)) / len(words) if words else 0,
             'exclamation_count': text.count('!'),
             'question_count': text.count('?'),
-            'caps_ratio': sum(1 for c in text if c.isupper()) / len(text) if text else 0
+            'caps_ratio': _count_upper(text) / len(text) if text else 0
         }
     
-    async def analyze_comprehensive(self, text: str) -> Dict:
-        """Comprehensive sentiment analysis using multiple methods"""
-        if not text or not text.strip():
-            return {
-                'error': 'Empty text provided',
-                'timestamp': datetime.now().isoformat()
-            }
-        
-        # Preprocess text
-        clean_text = self.preprocess_text(text)
-        
-        # Run analyses
-        vader_result = self.analyze_with_vader(clean_text)
-        transformer_result = self.analyze_with_transformer(clean_text)
-        emotions = self.get_emotion_indicators(clean_text)
-        metrics = self.calculate_text_metrics(text)
-        
+    def _analyze_lexical(self, text: str, clean_text: str) -> Tuple[Dict, Dict[str, float], Dict]:
+        """VADER, emotion keywords and text metrics for one text"""
+        return (
+            self.analyze_with_vader(clean_text),
+            self.get_emotion_indicators(clean_text),
+            self.calculate_text_metrics(text)
+        )
+    
+    def _analyze_lexical_batch(self, texts: List[str]) -> Tuple[List[str], List[Tuple]]:
+        """Preprocess and run the lexical passes over a whole batch"""
+        clean_texts = [self.preprocess_text(text) for text in texts]
+        return clean_texts, [
+            self._analyze_lexical(text, clean_text)
+            for text, clean_text in zip(texts, clean_texts)
+        ]
+    
+    def _build_result(self, text: str, clean_text: str, vader_result: Dict,
+                      transformer_result: Optional[Dict], emotions: Dict[str, float],
+                      metrics: Dict) -> Dict:
+        """Combine the per-method outputs into the final analysis"""
         # Ensemble result - combine VADER and transformer if available
         if transformer_result:
             # Weight transformer more heavily for final decision
@@ -192,7 +387,53 @@ class AdvancedSentimentAnalyzer:
             'timestamp': datetime.now().isoformat()
         }
     
+    async def analyze_comprehensive(self, text: str) -> Dict:
+        """Comprehensive sentiment analysis using multiple methods"""
+        if not text or not text.strip():
+            return {
+                'error': 'Empty text provided',
+                'timestamp': datetime.now().isoformat()
+            }
+        
+        # Preprocess text
+        clean_text = self.preprocess_text(text)
+        
+        # Run analyses; the lexical passes run in a worker thread while the
+        # transformer batch is pending, so neither blocks the event loop
+        (vader_result, emotions, metrics), transformer_result = await asyncio.gather(
+            asyncio.to_thread(self._analyze_lexical, text, clean_text),
+            self._submit_to_transformer_batch(clean_text)
+        )
+        
+        return self._build_result(text, clean_text, vader_result, transformer_result, emotions, metrics)
+    
     async def analyze_batch(self, texts: List[str]) -> List[Dict]:
-        """Analyze multiple texts efficiently"""
-        tasks = [self.analyze_comprehensive(text) for text in texts]
-        return await asyncio.gather(*tasks)
+        """Analyze multiple texts stage by stage rather than text by text"""
+        valid = [text for text in texts if text and text.strip()]
+        if valid:
+            clean_texts, lexical = await asyncio.to_thread(self._analyze_lexical_batch, valid)
+        else:
+            clean_texts, lexical = [], []
+        
+        # One transformer call covers the batch; repeated texts are scored once
+        transformer_by_text = {}
+        if self.transformer_pipeline and clean_texts:
+            unique_texts = list(dict.fromkeys(clean_texts))
+            transformer_results = await asyncio.to_thread(self.analyze_transformer_batch, unique_texts)
+            transformer_by_text = dict(zip(unique_texts, transformer_results))
+        
+        results = []
+        analyses = iter(zip(valid, clean_texts, lexical))
+        for text in texts:
+            if not text or not text.strip():
+                results.append({
+                    'error': 'Empty text provided',
+                    'timestamp': datetime.now().isoformat()
+                })
+                continue
+            text, clean_text, (vader_result, emotions, metrics) = next(analyses)
+            results.append(self._build_result(
+                text, clean_text, vader_result, transformer_by_text.get(clean_text),
+                emotions, metrics
+            ))
+        return results
@@ -1,25 +1,201 @@
 import asyncio
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List
 from datetime import datetime
+from collections import OrderedDict
 import re
+from operator import itemgetter
+import threading
 
 # NLP Libraries
 import nltk
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT, N_SCALAR, SPECIAL_CASES, SentimentIntensityAnalyzer, SentiText, negated
+)
 
-# Download NLTK data
+# Optional multi-pattern matcher for the emotion keyword scan
 try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('stopwords', quiet=True)
-    nltk.download('wordnet', quiet=True)
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Download NLTK data that isn't installed yet; deployments bake it in at
+# build time, so this normally finds everything without touching the network
+try:
+    for _package, _resource in (('punkt', 'tokenizers/punkt'),
+                                ('stopwords', 'corpora/stopwords'),
+                                ('wordnet', 'corpora/wordnet')):
+        try:
+            nltk.data.find(_resource)
+        except LookupError:
+            nltk.download(_package, quiet=True)
 except:
     pass
 
+# Text cleanup patterns, compiled once at import; URLs run to the next whitespace
+_URL_RE = re.compile(r'https?://\S+')
+_HTML_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+# Runs of '!' or '?' collapse to one character; a callable replacement is
+# much cheaper than expanding a '\1' template per match
+_REPEAT_PUNCT_RE = re.compile(r'([!?])\1+')
+_FIRST_GROUP = itemgetter(1)
+
+_ASCII_UPPER = b'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+def _count_upper(text: str) -> int:
+    """Count uppercase characters; ASCII text is counted with one C-level translate"""
+    if text.isascii():
+        return len(text) - len(text.encode('ascii').translate(None, _ASCII_UPPER))
+    return sum(1 for c in text if c.isupper())
+
+# Emotion lexicon: each emotion scores the fraction of its keywords found in the text
+EMOTION_KEYWORDS = {
+    'joy': ['happy', 'joy', 'excited', 'delighted', 'pleased', 'satisfied', 'amazing', 'wonderful', 'excellent', 'fantastic'],
+    'anger': ['angry', 'frustrated', 'annoyed', 'furious', 'irritated', 'outraged', 'terrible', 'awful', 'horrible', 'disgusting'],
+    'sadness': ['sad', 'disappointed', 'depressed', 'upset', 'heartbroken', 'miserable', 'poor', 'bad', 'worse', 'worst'],
+    'fear': ['afraid', 'scared', 'worried', 'anxious', 'nervous', 'concerned', 'uncertain', 'doubtful'],
+    'surprise': ['surprised', 'shocked', 'amazed', 'astonished', 'unexpected', 'wow', 'incredible'],
+    'disgust': ['disgusted', 'revolting', 'repulsive', 'gross', 'nasty', 'yuck']
+}
+
+# (emotion, keywords, keyword_count) lookup table, built once at import
+_EMOTION_LEXICON = tuple(
+    (emotion, tuple(keywords), len(keywords))
+    for emotion, keywords in EMOTION_KEYWORDS.items()
+    if keywords
+)
+
+def _build_emotion_automaton():
+    """Compile every emotion keyword into one Aho-Corasick automaton"""
+    automaton = ahocorasick.Automaton()
+    for index, (emotion, keywords, _) in enumerate(_EMOTION_LEXICON):
+        for keyword in keywords:
+            automaton.add_word(keyword, (keyword, index))
+    automaton.make_automaton()
+    return automaton
+
+_EMOTION_AUTOMATON = _build_emotion_automaton() if ahocorasick is not None else None
+
+# Result cache bounds: long texts are rarely resubmitted verbatim, so they
+# bypass the cache and at most RESULT_CACHE_SIZE short texts are retained
+RESULT_CACHE_SIZE = 4096
+RESULT_CACHE_MAX_TEXT = 2048
+
+# Lowercased copy of the token list VADER is currently scoring, per thread
+_vader_tokens = threading.local()
+
+def _lowered_tokens(words_and_emoticons: List[str]) -> List[str]:
+    """Lowercase a VADER token list once per polarity_scores call.
+    
+    The cached list is held by reference, so an identity match is always the
+    same unmodified token list.
+    """
+    if getattr(_vader_tokens, 'words', None) is not words_and_emoticons:
+        _vader_tokens.words = words_and_emoticons
+        _vader_tokens.lower = [str(w).lower() for w in words_and_emoticons]
+    return _vader_tokens.lower
+
+class CachedVader(SentimentIntensityAnalyzer):
+    """VADER with the token-list lowering shared across its context checks.
+    
+    Stock VADER re-lowercases every token of the text in _negation_check and
+    _special_idioms_check, up to four times per sentiment word, which is
+    quadratic on long reviews. Both checks below are unchanged apart from
+    reading the shared lowercased list.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # polarity_scores only rewrites single characters found in the emoji lexicon
+        self._emoji_chars = frozenset(key for key in self.emojis if len(key) == 1)
+    
+    def polarity_scores(self, text):
+        # Only lexicon words carry valence, so a text with no emoji and no
+        # lexicon token (after VADER's own punctuation stripping) always
+        # scores as fully neutral; skip tokenizing and scoring it word by word
+        if self._emoji_chars.isdisjoint(text):
+            words = text.split()
+            if self.lexicon.keys().isdisjoint(
+                SentiText._strip_punc_if_word(word).lower() for word in words
+            ):
+                return {'neg': 0.0, 'neu': 1.0 if words else 0.0, 'pos': 0.0, 'compound': 0.0}
+        return super().polarity_scores(text)
+    
+    @staticmethod
+    def _special_idioms_check(valence, words_and_emoticons, i):
+        words_and_emoticons_lower = _lowered_tokens(words_and_emoticons)
+        onezero = "{0} {1}".format(words_and_emoticons_lower[i - 1], words_and_emoticons_lower[i])
+        
+        twoonezero = "{0} {1} {2}".format(words_and_emoticons_lower[i - 2],
+                                          words_and_emoticons_lower[i - 1], words_and_emoticons_lower[i])
+        
+        twoone = "{0} {1}".format(words_and_emoticons_lower[i - 2], words_and_emoticons_lower[i - 1])
+        
+        threetwoone = "{0} {1} {2}".format(words_and_emoticons_lower[i - 3],
+                                           words_and_emoticons_lower[i - 2], words_and_emoticons_lower[i - 1])
+        
+        threetwo = "{0} {1}".format(words_and_emoticons_lower[i - 3], words_and_emoticons_lower[i - 2])
+        
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in SPECIAL_CASES:
+                valence = SPECIAL_CASES[seq]
+                break
+        
+        if len(words_and_emoticons_lower) - 1 > i:
+            zeroone = "{0} {1}".format(words_and_emoticons_lower[i], words_and_emoticons_lower[i + 1])
+            if zeroone in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroone]
+        if len(words_and_emoticons_lower) - 1 > i + 1:
+            zeroonetwo = "{0} {1} {2}".format(words_and_emoticons_lower[i], words_and_emoticons_lower[i + 1],
+                                              words_and_emoticons_lower[i + 2])
+            if zeroonetwo in SPECIAL_CASES:
+                valence = SPECIAL_CASES[zeroonetwo]
+        
+        # check for booster/dampener bi-grams such as 'sort of' or 'kind of'
+        for n_gram in (threetwoone, threetwo, twoone):
+            if n_gram in BOOSTER_DICT:
+                valence = valence + BOOSTER_DICT[n_gram]
+        return valence
+    
+    @staticmethod
+    def _negation_check(valence, words_and_emoticons, start_i, i):
+        words_and_emoticons_lower = _lowered_tokens(words_and_emoticons)
+        if start_i == 0:
+            if negated([words_and_emoticons_lower[i - (start_i + 1)]]):  # 1 word preceding lexicon word (w/o stopwords)
+                valence = valence * N_SCALAR
+        if start_i == 1:
+            if words_and_emoticons_lower[i - 2] == "never" and \
+                    (words_and_emoticons_lower[i - 1] == "so" or
+                     words_and_emoticons_lower[i - 1] == "this"):
+                valence = valence * 1.25
+            elif words_and_emoticons_lower[i - 2] == "without" and \
+                    words_and_emoticons_lower[i - 1] == "doubt":
+                valence = valence
+            elif negated([words_and_emoticons_lower[i - (start_i + 1)]]):  # 2 words preceding the lexicon word position
+                valence = valence * N_SCALAR
+        if start_i == 2:
+            if words_and_emoticons_lower[i - 3] == "never" and \
+                    (words_and_emoticons_lower[i - 2] == "so" or words_and_emoticons_lower[i - 2] == "this") or \
+                    (words_and_emoticons_lower[i - 1] == "so" or words_and_emoticons_lower[i - 1] == "this"):
+                valence = valence * 1.25
+            elif words_and_emoticons_lower[i - 3] == "without" and \
+                    (words_and_emoticons_lower[i - 2] == "doubt" or words_and_emoticons_lower[i - 1] == "doubt"):
+                valence = valence
+            elif negated([words_and_emoticons_lower[i - (start_i + 1)]]):  # 3 words preceding the lexicon word position
+                valence = valence * N_SCALAR
+        return valence
+
 class AdvancedSentimentAnalyzer:
     def __init__(self):
-        self.vader_analyzer = SentimentIntensityAnalyzer()
+        self.vader_analyzer = CachedVader()
         self.setup_logging()
+        # LRU of analysis results keyed on the raw text; analyze_text runs
+        # in worker threads, so the cache is guarded by a lock
+        self._result_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
         
     def setup_logging(self):
         logging.basicConfig(level=logging.INFO)
@@ -28,17 +204,16 @@ class AdvancedSentimentAnalyzer:
     def preprocess_text(self, text: str) -> str:
         """Clean and preprocess text for analysis"""
         # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+        text = _URL_RE.sub('', text)
         
         # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
+        text = _HTML_RE.sub('', text)
         
         # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WS_RE.sub(' ', text).strip()
         
         # Remove excessive punctuation
-        text = re.sub(r'[!]{2,}', '!', text)
-        text = re.sub(r'[?]{2,}', '?', text)
+        text = _REPEAT_PUNCT_RE.sub(_FIRST_GROUP, text)
         
         return text
     
@@ -64,23 +239,25 @@ class AdvancedSentimentAnalyzer:
     
     def get_emotion_indicators(self, text: str) -> Dict[str, float]:
         """Extract emotion indicators from text"""
-        emotion_keywords = {
-            'joy': ['happy', 'joy', 'excited', 'delighted', 'pleased', 'satisfied', 'amazing', 'wonderful', 'excellent', 'fantastic'],
-            'anger': ['angry', 'frustrated', 'annoyed', 'furious', 'irritated', 'outraged', 'terrible', 'awful', 'horrible', 'disgusting'],
-            'sadness': ['sad', 'disappointed', 'depressed', 'upset', 'heartbroken', 'miserable', 'poor', 'bad', 'worse', 'worst'],
-            'fear': ['afraid', 'scared', 'worried', 'anxious', 'nervous', 'concerned', 'uncertain', 'doubtful'],
-            'surprise': ['surprised', 'shocked', 'amazed', 'astonished', 'unexpected', 'wow', 'incredible'],
-            'disgust': ['disgusted', 'revolting', 'repulsive', 'gross', 'nasty', 'yuck']
-        }
-        
         text_lower = text.lower()
-        emotions = {}
         
-        for emotion, keywords in emotion_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            emotions[emotion] = score / len(keywords) if keywords else 0
-            
-        return emotions
+        if _EMOTION_AUTOMATON is not None:
+            # One pass over the text; each keyword still counts once, like `in`
+            hits = [0] * len(_EMOTION_LEXICON)
+            seen = set()
+            for _, (keyword, index) in _EMOTION_AUTOMATON.iter(text_lower):
+                if keyword not in seen:
+                    seen.add(keyword)
+                    hits[index] += 1
+            return {
+                emotion: hits[index] / keyword_count
+                for index, (emotion, _, keyword_count) in enumerate(_EMOTION_LEXICON)
+            }
+        
+        return {
+            emotion: sum(1 for keyword in keywords if keyword in text_lower) / keyword_count
+            for emotion, keywords, keyword_count in _EMOTION_LEXICON
+        }
     
     def calculate_text_metrics(self, text: str) -> Dict:
         """Calculate various text metrics"""
@@ -88,24 +265,53 @@ class AdvancedSentimentAnalyzer:
         sentences = text.split('.')
         
         # Compute average word length without numpy to keep dependencies light
-        avg_word_length = (sum(len(word) for word in words) / len(words)) if words else 0
+        avg_word_length = (sum(map(len, words)) / len(words)) if words else 0
         return {
             'word_count': len(words),
             'sentence_count': len([s for s in sentences if s.strip()]),
             'avg_word_length': avg_word_length,
             'exclamation_count': text.count('!'),
             'question_count': text.count('?'),
-            'caps_ratio': sum(1 for c in text if c.isupper()) / len(text) if text else 0
+            'caps_ratio': _count_upper(text) / len(text) if text else 0
         }
     
-    async def analyze_comprehensive(self, text: str) -> Dict:
-        """Comprehensive sentiment analysis using VADER only (Vercel optimized)"""
+    def analyze_text(self, text: str) -> Dict:
+        """Comprehensive sentiment analysis using VADER only (Vercel optimized).
+        
+        Purely CPU-bound; async callers should run it off the event loop.
+        Repeated short texts are served from a bounded LRU cache.
+        """
         if not text or not text.strip():
             return {
                 'error': 'Empty text provided',
                 'timestamp': datetime.now().isoformat()
             }
         
+        if len(text) >= RESULT_CACHE_MAX_TEXT:
+            return self._analyze_uncached(text)
+        
+        with self._cache_lock:
+            cached = self._result_cache.get(text)
+            if cached is not None:
+                self._result_cache.move_to_end(text)
+                self._cache_hits += 1
+        
+        if cached is None:
+            cached = self._analyze_uncached(text)
+            with self._cache_lock:
+                self._cache_misses += 1
+                self._result_cache[text] = cached
+                if len(self._result_cache) > RESULT_CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
+        
+        # Callers add top-level fields such as processing_time, so each one
+        # gets its own copy with a fresh timestamp
+        result = dict(cached)
+        result['timestamp'] = datetime.now().isoformat()
+        return result
+    
+    def _analyze_uncached(self, text: str) -> Dict:
+        """Run the full preprocessing, VADER, emotion and metrics pipeline"""
         # Preprocess text
         clean_text = self.preprocess_text(text)
         
@@ -130,7 +336,28 @@ class AdvancedSentimentAnalyzer:
             'timestamp': datetime.now().isoformat()
         }
     
+    def cache_info(self) -> Dict:
+        """Hit/miss counters for the result cache"""
+        with self._cache_lock:
+            return {
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'size': len(self._result_cache),
+                'max_size': RESULT_CACHE_SIZE,
+                'max_text_length': RESULT_CACHE_MAX_TEXT
+            }
+    
+    async def analyze_comprehensive(self, text: str) -> Dict:
+        """Async entry point; the CPU-bound analysis runs in a worker thread"""
+        return await asyncio.to_thread(self.analyze_text, text)
+    
+    def analyze_texts(self, texts: List[str]) -> List[Dict]:
+        """Analyze multiple texts in one synchronous pass"""
+        analyze = self.analyze_text
+        return [analyze(text) for text in texts]
+    
     async def analyze_batch(self, texts: List[str]) -> List[Dict]:
         """Analyze multiple texts efficiently"""
-        tasks = [self.analyze_comprehensive(text) for text in texts]
-        return await asyncio.gather(*tasks)
+        # One thread hop for the whole batch; per-text threads would only
+        # contend for the GIL
+        return await asyncio.to_thread(self.analyze_texts, texts)
@@ -1,10 +1,107 @@
 import asyncio
+import heapq
 import logging
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+from bisect import bisect_right
 import json
 from collections import Counter, defaultdict
-import statistics
+from itertools import chain, count
+from operator import mul
+import os
+import math
+import time
+
+# Optional multi-pattern matcher for the issue keyword scan
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# How long a pattern analysis is reused per `days` window. Dashboards poll
+# suggestions far more often than the trends they are built from move.
+PATTERN_CACHE_TTL = 60.0
+PATTERN_CACHE_MAX_ENTRIES = 32
+# `days` arrives from the query string; clamp it so it makes a bounded key
+PATTERN_MIN_DAYS = 1
+PATTERN_MAX_DAYS = 365
+
+# Satisfaction score thresholds and the grade for each band between them
+GRADE_THRESHOLDS = (50, 60, 70, 80)
+GRADES = 'FDCBA'
+
+# Sort rank for suggestion priorities; unknown priorities rank last
+PRIORITY_RANK = {'high': 3, 'medium': 2, 'low': 1}
+
+# Per-issue suggestion text; {percentage} is filled in from the issue data
+ISSUE_SUGGESTION_TEMPLATES = {
+    'quality_issues': {
+        'title': 'Address product quality concerns ({percentage}% of negative reviews)',
+        'description': 'Quality issues are mentioned in {percentage}% of negative reviews. Focus on improving product quality and reliability.',
+        'category': 'product_quality',
+        'action_items': (
+            'Implement stricter quality control processes',
+            'Review supplier/manufacturer standards',
+            'Conduct product testing and durability analysis',
+            'Create quality assurance checklist'
+        )
+    },
+    'usability_issues': {
+        'title': 'Improve product usability and user experience ({percentage}% mention)',
+        'description': 'Users find your product difficult to use. {percentage}% of negative reviews mention usability problems.',
+        'category': 'user_experience',
+        'action_items': (
+            'Conduct usability testing with real users',
+            'Simplify user interface and workflows',
+            'Create better onboarding and tutorials',
+            'Implement user-centered design principles'
+        )
+    },
+    'performance_issues': {
+        'title': 'Optimize performance and reliability ({percentage}% mention)',
+        'description': 'Performance issues are affecting customer satisfaction. {percentage}% of negative reviews cite performance problems.',
+        'category': 'product_quality',
+        'action_items': (
+            'Conduct performance auditing and optimization',
+            'Upgrade infrastructure and systems',
+            'Implement monitoring and alerting',
+            'Optimize code and resource usage'
+        )
+    },
+    'customer_service_issues': {
+        'title': 'Enhance customer service quality ({percentage}% mention)',
+        'description': 'Customer service issues are mentioned in {percentage}% of negative reviews. Improve support quality and responsiveness.',
+        'category': 'customer_service',
+        'action_items': (
+            'Train customer service representatives',
+            'Implement faster response time goals',
+            'Create comprehensive FAQ and self-service options',
+            'Monitor and improve service quality metrics'
+        )
+    },
+    'pricing_issues': {
+        'title': 'Review pricing strategy and value proposition ({percentage}% mention)',
+        'description': 'Pricing concerns appear in {percentage}% of negative reviews. Consider adjusting pricing or improving perceived value.',
+        'category': 'pricing_value',
+        'action_items': (
+            'Conduct competitive pricing analysis',
+            'Survey customers on price sensitivity',
+            'Improve value communication and benefits',
+            'Consider tiered pricing or promotions'
+        )
+    },
+    'delivery_issues': {
+        'title': 'Improve delivery and logistics ({percentage}% mention)',
+        'description': 'Delivery issues are mentioned in {percentage}% of negative reviews. Focus on improving shipping and fulfillment.',
+        'category': 'user_experience',
+        'action_items': (
+            'Review shipping partners and processes',
+            'Implement order tracking and communication',
+            'Optimize packaging to prevent damage',
+            'Set realistic delivery expectations'
+        )
+    }
+}
 
 class SuggestionEngine:
     """
@@ -16,6 +113,15 @@ class SuggestionEngine:
         self.db = db
         self.logger = logging.getLogger(__name__)
         
+        # days -> (computed_at, analysis), with one lock per key so concurrent
+        # misses share a single round of queries
+        self._pattern_cache: Dict[int, Tuple[float, Dict]] = {}
+        self._pattern_locks: Dict[int, asyncio.Lock] = {}
+        
+        # Suggestion ids are timestamp + pid + sequence number: unique across
+        # workers and restarts, and cheaper than hashing each title
+        self._id_counter = count()
+        
         # Define suggestion categories and their triggers
         self.suggestion_categories = {
             'customer_satisfaction': {
@@ -79,26 +185,98 @@ class SuggestionEngine:
                 'delivery problem', 'shipping cost', 'packaging'
             ]
         }
+        # Issue types are fixed, so the scan tracks them by position
+        self._issue_names = list(self.issue_keywords)
+        self._issue_automaton = self._build_issue_automaton()
+    
+    def _build_issue_automaton(self):
+        """Compile every issue keyword into one Aho-Corasick automaton, if available"""
+        if ahocorasick is None:
+            return None
+        
+        # A keyword listed under several issue types reports all their indices
+        keyword_issues = defaultdict(list)
+        for index, keywords in enumerate(self.issue_keywords.values()):
+            for keyword in keywords:
+                keyword_issues[keyword].append(index)
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, indices in keyword_issues.items():
+            automaton.add_word(keyword, tuple(indices))
+        automaton.make_automaton()
+        return automaton
     
     async def analyze_sentiment_patterns(self, days: int = 30) -> Dict:
         """Analyze sentiment patterns over time to identify trends"""
         if not self.db:
             return {}
+        
+        days = max(PATTERN_MIN_DAYS, min(days, PATTERN_MAX_DAYS))
+        cached = self._fresh_pattern_analysis(days)
+        if cached:
+            return cached
+        
+        lock = self._pattern_locks.setdefault(days, asyncio.Lock())
+        async with lock:
+            # Another caller may have filled the entry while we waited
+            cached = self._fresh_pattern_analysis(days)
+            if cached:
+                return cached
             
+            analysis = await self._compute_sentiment_patterns(days)
+            if analysis:
+                now = time.monotonic()
+                if len(self._pattern_cache) >= PATTERN_CACHE_MAX_ENTRIES:
+                    self._prune_pattern_cache(now)
+                self._pattern_cache[days] = (now, analysis)
+            return analysis
+    
+    def _prune_pattern_cache(self, now: float):
+        """Drop expired analyses (or all of them if none expired) and their idle locks"""
+        expired = [key for key, (stored_at, _) in self._pattern_cache.items()
+                   if now - stored_at >= PATTERN_CACHE_TTL]
+        for key in expired or list(self._pattern_cache):
+            del self._pattern_cache[key]
+        
+        # A lock that isn't held has no waiters, so it is safe to forget
+        for key in list(self._pattern_locks):
+            if key not in self._pattern_cache and not self._pattern_locks[key].locked():
+                del self._pattern_locks[key]
+    
+    def _fresh_pattern_analysis(self, days: int) -> Optional[Dict]:
+        """Return the cached analysis for `days` if it is still within the TTL"""
+        entry = self._pattern_cache.get(days)
+        if entry and time.monotonic() - entry[0] < PATTERN_CACHE_TTL:
+            return entry[1]
+        return None
+    
+    async def _compute_sentiment_patterns(self, days: int) -> Dict:
+        """Query the database and build the pattern analysis for `days`"""
         try:
-            # Get sentiment trends
-            trends = await self.db.get_sentiment_trends(days)
-            distribution = await self.db.get_sentiment_distribution(days)
-            emotion_analysis = await self.db.get_emotion_analysis(days)
-            recent_reviews = await self.db.get_recent_reviews(limit=200)
+            # The four reads are independent, so run them concurrently; one
+            # failing query degrades to empty data instead of losing the rest
+            results = await asyncio.gather(
+                self.db.get_sentiment_trend_columns(days),
+                self.db.get_sentiment_distribution(days),
+                self.db.get_emotion_analysis(days),
+                self.db.get_recent_reviews(limit=200),
+                return_exceptions=True
+            )
+            names = ('sentiment trends', 'sentiment distribution', 'emotion analysis', 'recent reviews')
+            defaults = ({}, {}, {}, [])
+            for index, result in enumerate(results):
+                if isinstance(result, Exception):
+                    self.logger.error(f"Error getting {names[index]}: {result}")
+                    results[index] = defaults[index]
+            trend_columns, distribution, emotion_analysis, recent_reviews = results
             
             analysis = {
-                'sentiment_trend': self._analyze_sentiment_trend(trends),
+                'sentiment_trend': self._analyze_sentiment_trend(trend_columns),
                 'sentiment_distribution': distribution,
                 'emotion_patterns': emotion_analysis,
                 'common_issues': await self._identify_common_issues(recent_reviews),
                 'satisfaction_score': self._calculate_satisfaction_score(distribution),
-                'review_volume_trend': self._analyze_review_volume(trends),
+                'review_volume_trend': self._analyze_review_volume(trend_columns),
                 'time_period': days
             }
             
@@ -108,24 +286,18 @@ class SuggestionEngine:
             self.logger.error(f"Error analyzing sentiment patterns: {e}")
             return {}
     
-    def _analyze_sentiment_trend(self, trends: Dict) -> Dict:
+    def _analyze_sentiment_trend(self, trend_columns: Dict) -> Dict:
         """Analyze if sentiment is improving, declining, or stable"""
-        if not trends:
+        dates = trend_columns.get('dates')
+        if not dates:
             return {'trend': 'insufficient_data', 'confidence': 0}
         
-        # Convert trends to time series
-        dates = sorted(trends.keys())
         if len(dates) < 3:
             return {'trend': 'insufficient_data', 'confidence': 0.3}
         
         # Calculate weighted sentiment scores over time
         sentiment_scores = []
-        for date in dates:
-            day_data = trends[date]
-            pos = day_data.get('positive', {}).get('count', 0)
-            neu = day_data.get('neutral', {}).get('count', 0) 
-            neg = day_data.get('negative', {}).get('count', 0)
-            
+        for pos, neu, neg in zip(trend_columns['positive'], trend_columns['neutral'], trend_columns['negative']):
             total = pos + neu + neg
             if total > 0:
                 # Weight: positive=1, neutral=0, negative=-1
@@ -158,7 +330,7 @@ class SuggestionEngine:
             'trend': trend,
             'confidence': round(confidence, 2),
             'slope': round(slope if 'slope' in locals() else 0, 4),
-            'recent_average': round(statistics.mean(recent_scores), 3) if recent_scores else 0
+            'recent_average': round(math.fsum(recent_scores) / len(recent_scores), 3) if recent_scores else 0
         }
     
     def _calculate_slope(self, x_vals: List, y_vals: List) -> float:
@@ -169,8 +341,9 @@ class SuggestionEngine:
         n = len(x_vals)
         sum_x = sum(x_vals)
         sum_y = sum(y_vals)
-        sum_xy = sum(x * y for x, y in zip(x_vals, y_vals))
-        sum_x_sq = sum(x * x for x in x_vals)
+        # map(mul, ...) keeps the products in C; same terms, same order
+        sum_xy = sum(map(mul, x_vals, y_vals))
+        sum_x_sq = sum(map(mul, x_vals, x_vals))
         
         denominator = n * sum_x_sq - sum_x * sum_x
         if denominator == 0:
@@ -180,33 +353,45 @@ class SuggestionEngine:
     
     async def _identify_common_issues(self, reviews: List[Dict]) -> Dict:
         """Identify common issues mentioned in negative reviews"""
-        issue_counts = defaultdict(int)
+        # Issue indices, once per review that mentions them; counted in one
+        # Counter call at the end, which also keeps first-seen order for ties
+        hits = []
         total_negative = 0
         
         for review in reviews:
             if review.get('sentiment') == 'negative':
                 total_negative += 1
+                # Keywords are lowercase; one str.lower() copy is far cheaper
+                # than translate() or case-insensitive matching
                 text = review.get('text', '').lower()
                 
-                for issue_type, keywords in self.issue_keywords.items():
+                if self._issue_automaton is not None:
+                    # One pass over the text finds every issue type it mentions
+                    matched = set()
+                    for _, indices in self._issue_automaton.iter(text):
+                        matched.update(indices)
+                    hits.extend(sorted(matched))
+                    continue
+                
+                for index, keywords in enumerate(self.issue_keywords.values()):
                     for keyword in keywords:
                         if keyword in text:
-                            issue_counts[issue_type] += 1
+                            hits.append(index)
                             break  # Count once per review per issue type
         
         # Calculate percentages and sort by frequency
-        issue_percentages = {}
-        for issue, count in issue_counts.items():
-            if total_negative > 0:
-                percentage = (count / total_negative) * 100
-                if percentage >= 5:  # Only include issues mentioned in 5%+ of negative reviews
-                    issue_percentages[issue] = {
-                        'count': count,
-                        'percentage': round(percentage, 1),
-                        'severity': 'high' if percentage >= 20 else 'medium' if percentage >= 10 else 'low'
-                    }
-        
-        return dict(sorted(issue_percentages.items(), key=lambda x: x[1]['percentage'], reverse=True))
+        issue_percentages = []
+        for index, count in Counter(hits).items():
+            percentage = (count / total_negative) * 100
+            if percentage >= 5:  # Only include issues mentioned in 5%+ of negative reviews
+                issue_percentages.append((self._issue_names[index], {
+                    'count': count,
+                    'percentage': round(percentage, 1),
+                    'severity': 'high' if percentage >= 20 else 'medium' if percentage >= 10 else 'low'
+                }))
+        
+        issue_percentages.sort(key=lambda x: x[1]['percentage'], reverse=True)
+        return dict(issue_percentages)
     
     def _calculate_satisfaction_score(self, distribution: Dict) -> Dict:
         """Calculate overall satisfaction score (0-100)"""
@@ -223,52 +408,28 @@ class SuggestionEngine:
         # Weight: positive=100, neutral=50, negative=0
         weighted_score = (pos * 100 + neu * 50 + neg * 0) / total
         
-        # Determine grade
-        if weighted_score >= 80:
-            grade = 'A'
-        elif weighted_score >= 70:
-            grade = 'B'
-        elif weighted_score >= 60:
-            grade = 'C'
-        elif weighted_score >= 50:
-            grade = 'D'
-        else:
-            grade = 'F'
-        
         return {
             'score': round(weighted_score, 1),
-            'grade': grade,
+            'grade': GRADES[bisect_right(GRADE_THRESHOLDS, weighted_score)],
             'total_reviews': total,
             'positive_ratio': round((pos / total) * 100, 1) if total > 0 else 0,
             'negative_ratio': round((neg / total) * 100, 1) if total > 0 else 0
         }
     
-    def _analyze_review_volume(self, trends: Dict) -> Dict:
+    def _analyze_review_volume(self, trend_columns: Dict) -> Dict:
         """Analyze if review volume is increasing or decreasing"""
-        if not trends:
+        daily_totals = trend_columns.get('total')
+        if not daily_totals:
             return {'trend': 'no_data', 'change': 0}
         
-        dates = sorted(trends.keys())
-        if len(dates) < 7:
-            return {'trend': 'insufficient_data', 'change': 0}
-        
-        # Calculate daily totals
-        daily_totals = []
-        for date in dates:
-            day_data = trends[date]
-            daily_total = sum(
-                sentiment_data.get('count', 0) 
-                for sentiment_data in day_data.values()
-                if isinstance(sentiment_data, dict)
-            )
-            daily_totals.append(daily_total)
-        
         if len(daily_totals) < 7:
             return {'trend': 'insufficient_data', 'change': 0}
         
         # Compare recent period vs previous period
-        recent_avg = statistics.mean(daily_totals[-7:])
-        previous_avg = statistics.mean(daily_totals[-14:-7]) if len(daily_totals) >= 14 else statistics.mean(daily_totals[:-7])
+        # Daily totals are ints, so sum / len is exactly what statistics.mean returns
+        recent_avg = sum(daily_totals[-7:]) / 7
+        previous = daily_totals[-14:-7] if len(daily_totals) >= 14 else daily_totals[:-7]
+        previous_avg = sum(previous) / len(previous)
         
         if previous_avg == 0:
             change = 0
@@ -294,44 +455,32 @@ class SuggestionEngine:
         if not analysis:
             analysis = await self.analyze_sentiment_patterns(days)
         
-        suggestions = []
-        
-        # Generate suggestions based on satisfaction score
-        satisfaction = analysis.get('satisfaction_score', {})
-        suggestions.extend(self._generate_satisfaction_suggestions(satisfaction))
-        
-        # Generate suggestions based on sentiment trends
-        trend_data = analysis.get('sentiment_trend', {})
-        suggestions.extend(self._generate_trend_suggestions(trend_data))
-        
-        # Generate suggestions based on common issues
-        issues = analysis.get('common_issues', {})
-        suggestions.extend(self._generate_issue_suggestions(issues))
-        
-        # Generate suggestions based on emotions
-        emotions = analysis.get('emotion_patterns', {})
-        suggestions.extend(self._generate_emotion_suggestions(emotions))
-        
-        # Generate suggestions based on review volume
-        volume = analysis.get('review_volume_trend', {})
-        suggestions.extend(self._generate_volume_suggestions(volume))
+        # Sort by priority and impact, keeping only the top 20; nlargest is
+        # stable, so ties keep the order the generators produced them in
+        suggestions = heapq.nlargest(
+            20,
+            chain(
+                self._generate_satisfaction_suggestions(analysis.get('satisfaction_score', {})),
+                self._generate_trend_suggestions(analysis.get('sentiment_trend', {})),
+                self._generate_issue_suggestions(analysis.get('common_issues', {})),
+                self._generate_emotion_suggestions(analysis.get('emotion_patterns', {})),
+                self._generate_volume_suggestions(analysis.get('review_volume_trend', {}))
+            ),
+            key=lambda x: (PRIORITY_RANK.get(x['priority'], 0), x.get('impact_score', 0))
+        )
         
-        # Add metadata to suggestions
+        # Add metadata to the suggestions that made the cut
+        now = datetime.now()
+        generated_at = now.isoformat()
+        id_prefix = f"sug_{int(now.timestamp())}_{os.getpid()}_"
         for suggestion in suggestions:
             suggestion.update({
-                'generated_at': datetime.now().isoformat(),
+                'generated_at': generated_at,
                 'analysis_period': days,
-                'id': f"sug_{hash(suggestion['title'] + suggestion['category'])}_{int(datetime.now().timestamp())}"
+                'id': f"{id_prefix}{next(self._id_counter)}"
             })
         
-        # Sort by priority and impact
-        priority_order = {'high': 3, 'medium': 2, 'low': 1}
-        suggestions.sort(
-            key=lambda x: (priority_order.get(x['priority'], 0), x.get('impact_score', 0)), 
-            reverse=True
-        )
-        
-        return suggestions[:20]  # Return top 20 suggestions
+        return suggestions
     
     def _generate_satisfaction_suggestions(self, satisfaction: Dict) -> List[Dict]:
         """Generate suggestions based on satisfaction score"""
@@ -451,86 +600,20 @@ class SuggestionEngine:
         percentage = data['percentage']
         severity = data['severity']
         
-        issue_suggestions = {
-            'quality_issues': {
-                'title': f'Address product quality concerns ({percentage}% of negative reviews)',
-                'description': f'Quality issues are mentioned in {percentage}% of negative reviews. Focus on improving product quality and reliability.',
-                'category': 'product_quality',
-                'action_items': [
-                    'Implement stricter quality control processes',
-                    'Review supplier/manufacturer standards',
-                    'Conduct product testing and durability analysis',
-                    'Create quality assurance checklist'
-                ]
-            },
-            'usability_issues': {
-                'title': f'Improve product usability and user experience ({percentage}% mention)',
-                'description': f'Users find your product difficult to use. {percentage}% of negative reviews mention usability problems.',
-                'category': 'user_experience',
-                'action_items': [
-                    'Conduct usability testing with real users',
-                    'Simplify user interface and workflows',
-                    'Create better onboarding and tutorials',
-                    'Implement user-centered design principles'
-                ]
-            },
-            'performance_issues': {
-                'title': f'Optimize performance and reliability ({percentage}% mention)',
-                'description': f'Performance issues are affecting customer satisfaction. {percentage}% of negative reviews cite performance problems.',
-                'category': 'product_quality',
-                'action_items': [
-                    'Conduct performance auditing and optimization',
-                    'Upgrade infrastructure and systems',
-                    'Implement monitoring and alerting',
-                    'Optimize code and resource usage'
-                ]
-            },
-            'customer_service_issues': {
-                'title': f'Enhance customer service quality ({percentage}% mention)',
-                'description': f'Customer service issues are mentioned in {percentage}% of negative reviews. Improve support quality and responsiveness.',
-                'category': 'customer_service',
-                'action_items': [
-                    'Train customer service representatives',
-                    'Implement faster response time goals',
-                    'Create comprehensive FAQ and self-service options',
-                    'Monitor and improve service quality metrics'
-                ]
-            },
-            'pricing_issues': {
-                'title': f'Review pricing strategy and value proposition ({percentage}% mention)',
-                'description': f'Pricing concerns appear in {percentage}% of negative reviews. Consider adjusting pricing or improving perceived value.',
-                'category': 'pricing_value',
-                'action_items': [
-                    'Conduct competitive pricing analysis',
-                    'Survey customers on price sensitivity',
-                    'Improve value communication and benefits',
-                    'Consider tiered pricing or promotions'
-                ]
-            },
-            'delivery_issues': {
-                'title': f'Improve delivery and logistics ({percentage}% mention)',
-                'description': f'Delivery issues are mentioned in {percentage}% of negative reviews. Focus on improving shipping and fulfillment.',
-                'category': 'user_experience',
-                'action_items': [
-                    'Review shipping partners and processes',
-                    'Implement order tracking and communication',
-                    'Optimize packaging to prevent damage',
-                    'Set realistic delivery expectations'
-                ]
-            }
-        }
-        
-        if issue_type in issue_suggestions:
-            suggestion = issue_suggestions[issue_type].copy()
-            suggestion.update({
-                'priority': 'high' if severity == 'high' else 'medium',
-                'impact_score': min(90, 20 + percentage * 2),
-                'effort_estimate': 'high' if severity == 'high' else 'medium',
-                'expected_outcome': f'Reduce {issue_type.replace("_", " ")} complaints by addressing root causes'
-            })
-            return suggestion
+        template = ISSUE_SUGGESTION_TEMPLATES.get(issue_type)
+        if template is None:
+            return None
         
-        return None
+        return {
+            'title': template['title'].format(percentage=percentage),
+            'description': template['description'].format(percentage=percentage),
+            'category': template['category'],
+            'action_items': list(template['action_items']),
+            'priority': 'high' if severity == 'high' else 'medium',
+            'impact_score': min(90, 20 + percentage * 2),
+            'effort_estimate': 'high' if severity == 'high' else 'medium',
+            'expected_outcome': f'Reduce {issue_type.replace("_", " ")} complaints by addressing root causes'
+        }
     
     def _generate_emotion_suggestions(self, emotions: Dict) -> List[Dict]:
         """Generate suggestions based on emotional patterns"""
@@ -2,24 +2,58 @@
 """
 Startup script for Railway deployment
 Handles NLTK data downloads and starts the FastAPI application
+
+NLTK data is normally installed at build time (see railway.toml), so the
+startup check finds it on disk and skips the network entirely.
 """
 import os
 import sys
-import subprocess
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# NLTK package id -> resource path used to check whether it is installed
+NLTK_PACKAGES = {
+    'vader_lexicon': 'sentiment/vader_lexicon.zip',
+    'punkt': 'tokenizers/punkt',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet'
+}
+
+# Downloads go to the first NLTK_DATA entry, or nltk_data/ next to this script
+NLTK_DATA_DIR = (os.getenv('NLTK_DATA') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data')).split(os.pathsep)[0]
+
 def download_nltk_data():
-    """Download required NLTK data"""
+    """Download whichever required NLTK packages are not installed yet"""
     try:
         import nltk
-        logger.info("Downloading NLTK data...")
-        nltk.download('vader_lexicon', quiet=True)
-        nltk.download('punkt', quiet=True)
-        nltk.download('stopwords', quiet=True)
+        if NLTK_DATA_DIR not in nltk.data.path:
+            nltk.data.path.append(NLTK_DATA_DIR)
+        
+        missing = []
+        for package, resource in NLTK_PACKAGES.items():
+            try:
+                nltk.data.find(resource)
+            except LookupError:
+                missing.append(package)
+        
+        if not missing:
+            logger.info("NLTK data already installed")
+            return
+        
+        logger.info(f"Downloading NLTK data: {', '.join(missing)}")
+        
+        # Fetch packages in parallel; each thread gets its own Downloader since
+        # the shared nltk.download instance caches the index without locking
+        def fetch(package):
+            from nltk.downloader import Downloader
+            return Downloader(download_dir=NLTK_DATA_DIR).download(package, quiet=True)
+        
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            list(executor.map(fetch, missing))
         logger.info("NLTK data downloaded successfully")
     except Exception as e:
         logger.warning(f"NLTK data download failed: {e}")
@@ -37,16 +71,20 @@ def main():
     # Start the FastAPI application
     logger.info(f"Starting uvicorn server on port {port}")
     
-    # Use subprocess to start uvicorn
-    cmd = [
-        sys.executable, "-m", "uvicorn", 
-        "backend.main:app", 
-        "--host", "0.0.0.0", 
-        "--port", port
-    ]
-    
+    # Serve from this process rather than a child interpreter, so the app is
+    # imported once and signals reach uvicorn directly
     try:
-        subprocess.run(cmd, check=True)
+        import uvicorn
+        uvicorn.run(
+            "backend.main:app",
+            host="0.0.0.0",
+            port=int(port),
+            # Same default as the uvicorn CLI's WEB_CONCURRENCY handling
+            workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+            # C event loop and HTTP parser
+            loop="uvloop",
+            http="httptools"
+        )
     except KeyboardInterrupt:
         logger.info("Application stopped by user")
     except Exception as e: